@@ -1,26 +1,301 @@
+import gzip
 import hashlib
+import importlib.util
 import io
 import json
+import multiprocessing
 import os
+import queue
+import re
 import shutil
+import sqlite3
+import subprocess
 import sys
+import tempfile
 import threading
 import time
 import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from contextlib import contextmanager
 from datetime import datetime
+from functools import lru_cache, partial, wraps
 
-import pytesseract
-from PIL import Image, ImageEnhance
-from PyQt5.QtCore import Qt, pyqtSignal, QThreadPool, QRunnable, QObject, QSettings
-from PyQt5.QtGui import QDragEnterEvent, QDropEvent, QIcon, QPixmap, QImage
+# Tesseract内部的OpenMP多线程与外层并行相互争抢CPU，反而更慢。
+# 必须在导入pytesseract/tesserocr之前设置，子进程会继承这些环境变量
+os.environ.setdefault('OMP_THREAD_LIMIT', '1')
+os.environ.setdefault('OMP_NUM_THREADS', '1')
+
+from PyQt5.QtCore import (Qt, pyqtSignal, QThreadPool, QRunnable, QObject, QSettings, QTimer,
+                          QStringListModel)
+from PyQt5.QtGui import QDragEnterEvent, QDropEvent, QIcon, QPixmap, QImage, QTextCursor
 from PyQt5.QtWidgets import (QApplication, QMainWindow, QPushButton, QLabel,
                              QVBoxLayout, QWidget, QFileDialog, QProgressBar, QTextEdit,
+                             QPlainTextEdit,
                              QMessageBox, QHBoxLayout, QComboBox, QSpinBox, QSlider, QDialog,
-                             QDialogButtonBox, QListWidget, QSplitter, QMenu,
+                             QDialogButtonBox, QListView, QAbstractItemView, QSplitter, QMenu,
                              QSystemTrayIcon, QTabWidget, QGroupBox, QLineEdit, QCheckBox,
                              QRadioButton)
-from pdf2image import convert_from_path
+# pytesseract、PIL、pdf2image较重，在首次识别时才导入，加快程序启动
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import zstandard
+except ImportError:
+    zstandard = None
+
+# 程序所在目录，只在启动时解析一次
+_APP_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# 批量获取文件大小时，超过该数量改用scandir按目录读取
+SCANDIR_BATCH_MIN = 20
+
+# PDF指纹只取首尾各64KB（PDF的更新总是追加在文件末尾），小文件整体计算
+FINGERPRINT_CHUNK = 64 << 10
+
+# 文字层超过该字符数的页面直接使用文字层，不再OCR
+TEXT_LAYER_MIN_CHARS = 20
+
+# 默认的OCR结果缓存目录
+DEFAULT_CACHE_DIR = os.path.join(os.path.expanduser('~'), '.pdfocr_cache')
+# 缓存有效期（24小时）及默认的缓存总大小上限
+CACHE_EXPIRE_SECONDS = 24 * 3600
+DEFAULT_CACHE_LIMIT_MB = 500
+# 缓存文本压缩保存：优先zstd，未安装时使用gzip；仍可读取旧版的.txt缓存
+CACHE_SUFFIXES = ('.zst', '.gz', '.txt')
+CACHE_READ_SUFFIXES = CACHE_SUFFIXES if zstandard else CACHE_SUFFIXES[1:]
+CACHE_TMP_SUFFIX = '.tmp'
+# 临时文件超过该时间仍未替换为缓存文件，才视为异常退出时的残留
+CACHE_TMP_GRACE_SECONDS = 600
+# mkstemp创建的文件权限为0600，写入后按umask改为与普通文件相同的权限
+_UMASK = os.umask(0)
+os.umask(_UMASK)
+_FILE_MODE = 0o666 & ~_UMASK
+# 各缓存目录的总大小：扫描时得到准确值，之后按写入的字节数累加，超过上限时才重新扫描
+_cache_usage = {}
+_cache_usage_lock = threading.Lock()
+
+# 历史记录保存在SQLite数据库中，识别结果在点击记录时才读取
+HISTORY_DB = 'history.db'
+HISTORY_FIELDS = ('id', 'time', 'filename', 'size', 'lines', 'words', 'chars')
+MAX_HISTORY = 500
+# 旧版的历史记录文件，首次创建数据库时导入
+HISTORY_FILE = 'history.jsonl'
+LEGACY_HISTORY_FILE = 'history.json'
+# 数据库的user_version达到该值表示旧版历史记录已导入
+HISTORY_DB_VERSION = 1
+HISTORY_DIR = 'history'
+
+# 设置修改后延迟写入的时间
+SETTINGS_FLUSH_DELAY_MS = 5000
+
+# 日志窗口保留的最大行数和刷新间隔
+MAX_LOG_LINES = 1000
+LOG_FLUSH_INTERVAL_MS = 100
+
+# 日志窗口样式表，切换主题时直接复用
+LIGHT_LOG_QSS = """
+    QPlainTextEdit {
+        background-color: #f5f5f5;
+        color: #333333;
+        font-family: 'Consolas', 'Courier New', monospace;
+        font-size: 12px;
+        line-height: 1.5;
+        border: 1px solid #cccccc;
+        border-radius: 4px;
+        padding: 8px;
+    }
+    QScrollBar:vertical {
+        border: none;
+        background: #f5f5f5;
+        width: 10px;
+        margin: 0px;
+    }
+    QScrollBar::handle:vertical {
+        background: #cccccc;
+        min-height: 20px;
+        border-radius: 5px;
+    }
+    QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
+        height: 0px;
+    }
+    QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical {
+        background: none;
+    }
+"""
+
+DARK_LOG_QSS = """
+    QPlainTextEdit {
+        background-color: #323232;
+        color: #ffffff;
+        font-family: 'Consolas', 'Courier New', monospace;
+        font-size: 12px;
+        line-height: 1.5;
+        border: 1px solid #555555;
+        border-radius: 4px;
+        padding: 8px;
+    }
+"""
+
+# Tesseract OSD检测出的文字脚本对应的识别语言
+OSD_SCRIPT_LANGUAGES = {
+    'Han': 'chi_sim',
+    'HanS': 'chi_sim',
+    'HanT': 'chi_sim',
+    'Latin': 'eng',
+    'Japanese': 'jpn',
+    'Korean': 'kor',
+}
+
+# 校对前对OCR结果做的常见错误修正，按顺序应用
+_OCR_FIXUPS = [
+    (re.compile(r'\n\s*\n+'), '\n\n'),   # 连续空行合并为一个
+    # 千位分组中被插入的空格，如"1 234 567"；"2023 12 05"这类独立的数字不合并
+    (re.compile(r'\b\d{1,3}(?: \d{3})+\b'), lambda m: m.group().replace(' ', '')),
+    (re.compile(r'[|](?=\d)'), '1'),       # 数字前被识别为竖线的1
+]
+# 重复空格只在OCR识别的页面中合并，文字层页面保留pdftotext -layout的列对齐
+_REPEATED_SPACES_RE = re.compile(r'[ \t]{2,}')
+_PAGE_HEADER_RE = re.compile(r'^(=== 第 (\d+) 页 ===\n)', re.M)
+
+
+def clean_ocr_text(text, ocr_pages=None):
+    """修正OCR结果中的常见错误，ocr_pages为经过OCR的页码集合（从1开始），未知时不合并空格"""
+    for pattern, repl in _OCR_FIXUPS:
+        text = pattern.sub(repl, text)
+    if not ocr_pages:
+        return text
+    # 切分后依次为：页头之前的内容，然后每页的页头、页码和正文
+    parts = _PAGE_HEADER_RE.split(text)
+    cleaned = [parts[0]]
+    for i in range(1, len(parts), 3):
+        header, page, body = parts[i:i + 3]
+        if int(page) in ocr_pages:
+            body = _REPEATED_SPACES_RE.sub(' ', body)
+        cleaned += [header, body]
+    return ''.join(cleaned)
+
+@lru_cache(maxsize=32)
+def read_cache_file(cache_file, mtime_ns):
+    """读取缓存文件，文件未修改时直接返回内存中的内容"""
+    with open(cache_file, 'rb') as f:
+        data = f.read()
+    if cache_file.endswith('.zst'):
+        data = zstandard.ZstdDecompressor().decompress(data)
+    elif cache_file.endswith('.gz'):
+        data = gzip.decompress(data)
+    return data.decode('utf-8')
+
+def write_cache_file(cache_base, text):
+    """压缩写入缓存文件，cache_base为不含扩展名的路径，返回写入的字节数"""
+    data = text.encode('utf-8')
+    if zstandard:
+        cache_file = cache_base + '.zst'
+        data = zstandard.ZstdCompressor(level=3).compress(data)
+    else:
+        cache_file = cache_base + '.gz'
+        data = gzip.compress(data, compresslevel=1)
+    # 先写入同目录下的临时文件再替换，中途退出时不会留下不完整的缓存
+    fd, tmp_file = tempfile.mkstemp(suffix=CACHE_TMP_SUFFIX, dir=os.path.dirname(cache_file))
+    try:
+        with os.fdopen(fd, 'wb') as f:
+            f.write(data)
+        os.chmod(tmp_file, _FILE_MODE)
+        os.replace(tmp_file, cache_file)
+    except BaseException:
+        try:
+            os.remove(tmp_file)
+        except OSError:
+            pass
+        raise
+    return len(data)
+
+def load_json_line(line):
+    if orjson is not None:
+        return orjson.loads(line)
+    return json.loads(line)
+
+def otsu_threshold(histogram):
+    """根据256级灰度直方图计算Otsu阈值"""
+    total = sum(histogram)
+    sum_all = sum(i * n for i, n in enumerate(histogram))
+    sum_bg = weight_bg = 0
+    best_threshold, best_variance = 0, -1.0
+    for i, n in enumerate(histogram):
+        weight_bg += n
+        if weight_bg == 0:
+            continue
+        weight_fg = total - weight_bg
+        if weight_fg == 0:
+            break
+        sum_bg += i * n
+        mean_bg = sum_bg / weight_bg
+        mean_fg = (sum_all - sum_bg) / weight_fg
+        variance = weight_bg * weight_fg * (mean_bg - mean_fg) ** 2
+        if variance > best_variance:
+            best_threshold, best_variance = i, variance
+    return best_threshold
+
+# 统计词数用的正则，只编译一次
+_WORD_RE = re.compile(r'\S+')
+
+def text_stats(text):
+    """统计文本的行数、词数和字符数，不按行切分文本"""
+    return text.count('\n') + 1, len(_WORD_RE.findall(text)), len(text)
+
+
+def pil_to_qimage(img):
+    """将PIL图像转换为QImage，灰度页面直接使用8位灰度格式"""
+    if img.mode == 'L':
+        data = img.tobytes()
+        image_format = QImage.Format_Grayscale8
+        bytes_per_line = img.width
+    else:
+        if img.mode != 'RGB':
+            img = img.convert('RGB')
+        data = img.tobytes('raw', 'RGB')
+        image_format = QImage.Format_RGB888
+        bytes_per_line = img.width * 3
+    # QImage不持有data，复制一份避免data释放后图像失效
+    return QImage(data, img.width, img.height, bytes_per_line, image_format).copy()
+
+def get_file_size(path):
+    """返回文件大小，文件不存在或无法访问时为-1，只调用一次stat"""
+    try:
+        return os.stat(path).st_size
+    except OSError:
+        return -1
 
+def file_sizes(paths):
+    """批量获取文件大小，文件较多时按所在目录用scandir一次读取"""
+    if len(paths) <= SCANDIR_BATCH_MIN:
+        return {path: get_file_size(path) for path in paths}
+    paths_by_dir = {}
+    for path in paths:
+        paths_by_dir.setdefault(os.path.dirname(path), []).append(path)
+    sizes = {}
+    for directory, dir_paths in paths_by_dir.items():
+        entry_sizes = {}
+        try:
+            with os.scandir(directory or '.') as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            entry_sizes[entry.name] = entry.stat().st_size
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+        for path in dir_paths:
+            size = entry_sizes.get(os.path.basename(path))
+            # 文件名大小写不一致等情况单独stat
+            sizes[path] = size if size is not None else get_file_size(path)
+    return sizes
 
 def get_resource_path(relative_path):
     if getattr(sys, 'frozen', False):
@@ -28,9 +303,22 @@ def get_resource_path(relative_path):
         base_path = sys._MEIPASS
     else:
         # 如果是开发环境
-        base_path = os.path.dirname(os.path.abspath(__file__))
+        base_path = _APP_DIR
     return os.path.join(base_path, relative_path)
 
+def cache_found_path(func):
+    """缓存查找到的路径；未找到时不缓存，安装组件后重新检查依赖即可找到"""
+    found = None
+
+    @wraps(func)
+    def wrapper():
+        nonlocal found
+        if found is None:
+            found = func()
+        return found
+    return wrapper
+
+@cache_found_path
 def get_tesseract_path():
     # 首先检查打包后的路径
     tesseract_path = get_resource_path(os.path.join('tesseract', 'tesseract.exe'))
@@ -55,6 +343,7 @@ def get_tesseract_path():
     
     return None
 
+@cache_found_path
 def get_tessdata_path():
     # 首先检查打包后的路径
     tessdata_path = get_resource_path('tessdata')
@@ -81,6 +370,7 @@ def get_tessdata_path():
     
     return None
 
+@cache_found_path
 def get_poppler_path():
     # 首先检查打包后的路径
     poppler_path = get_resource_path('poppler')
@@ -108,6 +398,16 @@ def get_poppler_path():
     
     return None
 
+@lru_cache(maxsize=1)
+def get_physical_cpu_count():
+    """获取物理核心数，未安装psutil时使用逻辑核心数"""
+    try:
+        import psutil
+        count = psutil.cpu_count(logical=False)
+    except ImportError:
+        count = None
+    return count or os.cpu_count() or 1
+
 def check_dependencies():
     errors = []
     
@@ -159,6 +459,87 @@ def check_dependencies():
     
     return errors
 
+class DependencyCheckSignals(QObject):
+    finished = pyqtSignal(list)
+
+class DependencyCheckTask(QRunnable):
+    """在线程池中检查依赖，避免启动时阻塞界面"""
+    def __init__(self):
+        super().__init__()
+        self.signals = DependencyCheckSignals()
+
+    def run(self):
+        self.signals.finished.emit(check_dependencies())
+
+class JsonSaveTask(QRunnable):
+    """在线程池中写入JSON文件，连续多次保存时只写入最新的数据"""
+    def __init__(self, path):
+        super().__init__()
+        # 同一个任务对象反复提交
+        self.setAutoDelete(False)
+        self.path = path
+        self._lock = threading.Lock()
+        self._write_lock = threading.Lock()
+        self._data = None
+        self._scheduled = False
+
+    def schedule(self, pool, data):
+        with self._lock:
+            self._data = data
+            if self._scheduled:
+                return
+            self._scheduled = True
+        pool.start(self)
+
+    def run(self):
+        with self._write_lock:
+            with self._lock:
+                data, self._data = self._data, None
+                self._scheduled = False
+            if data is None:
+                return
+            with open(self.path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False, separators=(',', ':'))
+
+class CachedSettings(QObject):
+    """在内存中缓存QSettings的读写，修改的设置延迟一段时间后统一写入"""
+    def __init__(self, settings, parent=None):
+        super().__init__(parent)
+        self._settings = settings
+        self._cache = {}
+        self._dirty = set()
+        self._flush_timer = QTimer(self)
+        self._flush_timer.setSingleShot(True)
+        self._flush_timer.setInterval(SETTINGS_FLUSH_DELAY_MS)
+        self._flush_timer.timeout.connect(self.sync)
+
+    def value(self, key, default=None, type=None):
+        if key not in self._cache:
+            if type is None:
+                self._cache[key] = self._settings.value(key, default)
+            else:
+                self._cache[key] = self._settings.value(key, default, type=type)
+        return self._cache[key]
+
+    def setValue(self, key, value):
+        cached = self._cache.get(key)
+        # 同一个对象可能已被原地修改，只有不同对象且值相等时才跳过
+        if key in self._cache and cached is not value and cached == value:
+            return
+        self._cache[key] = value
+        self._dirty.add(key)
+        self._flush_timer.start()
+
+    def sync(self):
+        """把修改过的设置写入QSettings"""
+        self._flush_timer.stop()
+        if not self._dirty:
+            return
+        for key in self._dirty:
+            self._settings.setValue(key, self._cache[key])
+        self._dirty.clear()
+        self._settings.sync()
+
 class OCRConfigDialog(QDialog):
     def __init__(self, parent=None):
         super().__init__(parent)
@@ -190,13 +571,23 @@ class OCRConfigDialog(QDialog):
         # DPI设置
         dpi_layout = QHBoxLayout()
         self.dpi_spin = QSpinBox()
-        self.dpi_spin.setRange(100, 1200)
-        self.dpi_spin.setValue(600)
+        self.dpi_spin.setRange(100, 600)
+        self.dpi_spin.setValue(300)
         self.dpi_spin.setSingleStep(100)
+        self.auto_dpi_check = QCheckBox("自动")
+        self.auto_dpi_check.toggled.connect(
+            lambda checked: self.dpi_spin.setEnabled(not checked))
         dpi_layout.addWidget(QLabel("DPI:"))
         dpi_layout.addWidget(self.dpi_spin)
+        dpi_layout.addWidget(self.auto_dpi_check)
         engine_layout.addLayout(dpi_layout)
         
+        # 高于300DPI时按300DPI渲染识别，普通印刷文字在300DPI时识别率已经足够
+        self.downsample_check = QCheckBox("识别时降至300DPI")
+        self.auto_dpi_check.toggled.connect(
+            lambda checked: self.downsample_check.setEnabled(not checked))
+        engine_layout.addWidget(self.downsample_check)
+        
         # OEM模式
         self.oem_combo = QComboBox()
         self.oem_combo.addItems([
@@ -271,6 +662,15 @@ class OCRConfigDialog(QDialog):
         self.sharpen_slider.valueChanged.connect(
             lambda v: self.sharpen_label.setText(f"{v}%"))
 
+        # 二值化（需要OpenCV）
+        self.binarize_check = QCheckBox("自适应二值化")
+        
+        # 自适应对比度（需要OpenCV），光照不均的扫描件效果比全局对比度好
+        self.adaptive_contrast_check = QCheckBox("自适应对比度 (CLAHE)")
+        self.adaptive_contrast_check.toggled.connect(
+            lambda checked: (self.contrast_slider.setEnabled(not checked),
+                             self.brightness_slider.setEnabled(not checked)))
+
         # 识别来源
         source_group = QGroupBox("识别来源")
         source_layout = QVBoxLayout()
@@ -281,6 +681,10 @@ class OCRConfigDialog(QDialog):
         ])
         source_layout.addWidget(QLabel("选择识别方式:"))
         source_layout.addWidget(self.source_combo)
+        # 已有文字层的页面直接提取文字，不再渲染和识别
+        self.text_layer_check = QCheckBox("优先使用PDF自带文字层")
+        self.text_layer_check.setChecked(True)
+        source_layout.addWidget(self.text_layer_check)
         source_group.setLayout(source_layout)
 
         # 添加到主布局
@@ -289,6 +693,8 @@ class OCRConfigDialog(QDialog):
         preprocess_layout.addLayout(contrast_layout)
         preprocess_layout.addLayout(brightness_layout)
         preprocess_layout.addLayout(sharpen_layout)
+        preprocess_layout.addWidget(self.adaptive_contrast_check)
+        preprocess_layout.addWidget(self.binarize_check)
         preprocess_group.setLayout(preprocess_layout)
         
         # 添加所有组到主布局
@@ -313,9 +719,14 @@ class OCRConfigDialog(QDialog):
             'oem': self.oem_combo.currentIndex(),
             'psm': self.psm_combo.currentIndex(),
             'dpi': self.dpi_spin.value(),
+            'auto_dpi': self.auto_dpi_check.isChecked(),
+            'downsample': self.downsample_check.isChecked(),
             'contrast': self.contrast_slider.value() / 100.0,
             'brightness': self.brightness_slider.value() / 100.0,
-            'sharpen': self.sharpen_slider.value() / 100.0
+            'sharpen': self.sharpen_slider.value() / 100.0,
+            'binarize': self.binarize_check.isChecked(),
+            'adaptive_contrast': self.adaptive_contrast_check.isChecked(),
+            'use_text_layer': self.text_layer_check.isChecked()
         }
 
 class BaiduAPISettingsDialog(QDialog):
@@ -419,81 +830,116 @@ class BaiduAPISettingsDialog(QDialog):
         self.accept()
 
 
+class TesseractAPIPool:
+    """tesserocr实例池，跨页面和跨文件复用已加载语言模型的引擎"""
+    def __init__(self, size=4):
+        self.size = size
+        self._lock = threading.Lock()
+        self._queues = {}
+        self._created = {}
+
+    @staticmethod
+    def is_available():
+        # 只检查是否已安装，不导入
+        return importlib.util.find_spec('tesserocr') is not None
+
+    @contextmanager
+    def acquire(self, tessdata_path, language, oem):
+        """取出一个引擎，用完后归还"""
+        key = (tessdata_path, language, oem)
+        with self._lock:
+            api_queue = self._queues.setdefault(key, queue.Queue())
+            # 按需创建，最多创建size个实例
+            create = api_queue.empty() and self._created.get(key, 0) < self.size
+            if create:
+                self._created[key] = self._created.get(key, 0) + 1
+        
+        if create:
+            import tesserocr
+            try:
+                api = tesserocr.PyTessBaseAPI(path=tessdata_path, lang=language, oem=oem)
+            except Exception:
+                with self._lock:
+                    self._created[key] -= 1
+                raise
+        else:
+            api = api_queue.get()
+        
+        try:
+            yield api
+        finally:
+            api_queue.put(api)
+
+    def close(self):
+        """释放所有引擎"""
+        with self._lock:
+            for api_queue in self._queues.values():
+                while not api_queue.empty():
+                    api_queue.get_nowait().End()
+            self._queues.clear()
+            self._created.clear()
+
 class OCRSignals(QObject):
     log = pyqtSignal(str)
+    log_batch = pyqtSignal(list)
     progress = pyqtSignal(int)
+    page_done = pyqtSignal(int, str)
     finished = pyqtSignal(str)
 
-class OCRWorker(QRunnable):
-    def __init__(self, pdf_path, config, progress_callback, log_callback, finished_callback):
-        super().__init__()
-        self.pdf_path = pdf_path
+class PageRecognizer:
+    """识别单个页面，识别子进程和OCRWorker共用，不依赖Qt对象"""
+    def __init__(self, config, cache_dir, api_pool=None, verbose=False,
+                 baidu_credentials=('', '', ''), log=None):
         self.config = config
-        self.progress_callback = progress_callback
-        self.log_callback = log_callback
-        self.finished_callback = finished_callback
-        self._stop_event = threading.Event()
-        self.settings = QSettings("PDF_OCR", "BaiduAPI")
-        self.request_queue = []
+        self.api_pool = api_pool
+        self.verbose = verbose
+        self.baidu_credentials = baidu_credentials
         self.max_retries = 3
         self.retry_delay = 2  # 秒
-        self.cache = {}
-        self.images = []  # 添加images属性
-        self.stats = {
-            'total_pages': 0,
-            'processed_pages': 0,
-            'total_words': 0,
-            'total_lines': 0,
-            'total_chars': 0,
-            'confidence': 0.0
-        }
-        self.signals = OCRSignals()
+        self._cache_dir = cache_dir
+        # 未指定log时日志先缓存，由take_logs取走
+        self._log_buffer = []
+        self._log_func = log or self._log_buffer.append
+        self._config_hash = None
+        # 写入缓存的总字节数，用于累计缓存目录大小
+        self.bytes_written = 0
+        self._detected_language = None
+        self._warned_no_cv2 = False
+        self._warned_no_clahe = False
+
+    def _log(self, message):
+        self._log_func(message)
+
+    def _debug(self, message):
+        """每页的处理步骤，只在开启详细日志时显示"""
+        if self.verbose:
+            self._log(message)
+
+    def take_logs(self):
+        """取走缓存的日志"""
+        logs, self._log_buffer[:] = list(self._log_buffer), []
+        return logs
+
+    def recognize_page(self, image_path):
+        """识别一张已渲染的页面图像"""
+        if self.config.get('source') == '百度OCR (在线)':
+            from PIL import Image
+            with Image.open(image_path) as img:
+                return self._process_with_baidu(img)
+        return self._process_with_tesseract(self._load_page(image_path))
 
-    def _validate_pdf(self):
-        """验证PDF文件"""
-        try:
-            # 检查文件是否存在
-            if not os.path.exists(self.pdf_path):
-                raise ValueError(f"文件不存在: {self.pdf_path}")
-                
-            # 检查文件大小
-            file_size = os.path.getsize(self.pdf_path)
-            if file_size == 0:
-                raise ValueError("文件为空")
-                
-            # 检查文件格式
-            with open(self.pdf_path, 'rb') as f:
-                header = f.read(4)
-                if header != b'%PDF':
-                    raise ValueError("不是有效的PDF文件")
-                    
-            # 检查文件是否可读
-            try:
-                with open(self.pdf_path, 'rb') as f:
-                    f.read(1)
-            except IOError:
-                raise ValueError("文件无法读取，请检查文件权限")
-                
-            return True
-            
-        except Exception as e:
-            self.log_callback(f"PDF文件验证失败: {str(e)}")
-            raise
-            
     def _process_with_baidu(self, img):
         """使用百度OCR处理图像"""
         try:
             # 检查缓存
-            cache_key = self._get_cache_key()
-            cached_result = self._get_cached_result(cache_key)
+            cache_key = self._get_page_cache_key(img)
+            cached_result = self.get_cached_result(cache_key)
             if cached_result:
-                self.log_callback("使用缓存结果")
+                self._debug("使用缓存结果")
                 return cached_result
                 
             # 获取API配置
-            app_id = self.settings.value("app_id", "")
-            api_key = self.settings.value("api_key", "")
-            secret_key = self.settings.value("secret_key", "")
+            app_id, api_key, secret_key = self.baidu_credentials
             
             # 检查API配置是否完整
             if not all([app_id, api_key, secret_key]):
@@ -557,7 +1003,7 @@ class OCRWorker(QRunnable):
                         text = '\n'.join([item['words'] for item in result.get('words_result', [])])
                     
                     # 缓存结果
-                    self._cache_result(cache_key, text)
+                    self.cache_result(cache_key, text)
                     return text
                     
                 except Exception as e:
@@ -566,18 +1012,27 @@ class OCRWorker(QRunnable):
                     time.sleep(self.retry_delay)
                     
         except Exception as e:
-            self.log_callback(f"百度OCR处理失败: {str(e)}")
+            self._log(f"百度OCR处理失败: {str(e)}")
             return None
 
     def _process_with_tesseract(self, img):
         """使用Tesseract处理图像"""
         try:
+            import pytesseract
+            
             # 检查缓存
-            cache_key = self._get_cache_key()
-            cached_result = self._get_cached_result(cache_key)
+            cache_key = self._get_page_cache_key(img)
+            cached_result = self.get_cached_result(cache_key)
             if cached_result:
-                self.log_callback("使用缓存结果")
+                self._debug("使用缓存结果")
                 return cached_result
+            
+            from PIL import Image
+            page_array = None
+            if not isinstance(img, Image.Image):
+                # OpenCV读入的页面是numpy数组，包装为共享同一块内存的PIL图像
+                page_array = img
+                img = Image.fromarray(page_array)
                 
             # 设置Tesseract路径
             tesseract_path = get_tesseract_path()
@@ -601,17 +1056,12 @@ class OCRWorker(QRunnable):
                 elif language == "自动检测":
                     language = 'auto'
                     
+            # pytesseract按image.format把图像写入临时文件交给tesseract，
+            # 改为BMP可以省去每页的PNG压缩编码
+            img.format = 'BMP'
+            
             if language == 'auto':
-                # 简单的语言检测
-                text = pytesseract.image_to_string(img, lang='chi_sim')
-                if len(text.strip()) > 0:
-                    language = 'chi_sim'
-                else:
-                    text = pytesseract.image_to_string(img, lang='eng')
-                    if len(text.strip()) > 0:
-                        language = 'eng'
-                    else:
-                        language = 'chi_sim'
+                language = self._detect_language(img, tessdata_path)
                         
             # 检查语言文件
             lang_path = os.path.join(tessdata_path, f"{language}.traineddata")
@@ -619,20 +1069,13 @@ class OCRWorker(QRunnable):
                 raise ValueError(f"找不到语言文件: {language}")
                 
             # 配置Tesseract参数
-            custom_config = f'--oem {self.config.get("oem", 1)} --psm {self.config.get("psm", 3)}'
-            
-            # 预处理图像
-            if img.mode != 'L':
-                img = img.convert('L')
-                
-            # 应用对比度和亮度
-            contrast = self.config.get('contrast', 1.0)
-            brightness = self.config.get('brightness', 1.0)
+            # 页面是白底黑字，关闭反色检测，省去每行的反色重识别
+            custom_config = (f'--oem {self.config.get("oem", 1)} --psm {self.config.get("psm", 3)}'
+                             f' -c tessedit_do_invert=0')
             
-            enhancer = ImageEnhance.Contrast(img)
-            img = enhancer.enhance(contrast)
-            enhancer = ImageEnhance.Brightness(img)
-            img = enhancer.enhance(brightness)
+            # 预处理图像（页面已按灰度渲染）
+            img = self._preprocess_image(img, page_array)
+            img.format = 'BMP'
             
             # 获取格式信息
             if self.config.get('format') == '保留原始格式':
@@ -654,6 +1097,13 @@ class OCRWorker(QRunnable):
                     if words:
                         lines.append(' '.join(words))
                 text = '\n'.join(lines)
+            elif self.api_pool and TesseractAPIPool.is_available():
+                # 使用常驻的tesserocr引擎，避免每页启动进程并重新加载语言模型
+                with self.api_pool.acquire(tessdata_path, language, self.config.get("oem", 1)) as api:
+                    api.SetPageSegMode(self.config.get("psm", 3))
+                    api.SetVariable("tessedit_do_invert", "0")
+                    api.SetImage(img)
+                    text = api.GetUTF8Text()
             else:
                 # 普通文本输出
                 text = pytesseract.image_to_string(
@@ -663,54 +1113,413 @@ class OCRWorker(QRunnable):
                 )
             
             # 缓存结果
-            self._cache_result(cache_key, text)
+            self.cache_result(cache_key, text)
             return text
             
         except Exception as e:
-            self.log_callback(f"Tesseract处理失败: {str(e)}")
+            self._log(f"Tesseract处理失败: {str(e)}")
             return None
 
-    def _get_cached_result(self, cache_key):
+    def _detect_language(self, img, tessdata_path):
+        """自动检测语言，每个文档只检测一次"""
+        if self._detected_language:
+            return self._detected_language
+        import pytesseract
+        
+        # 优先使用OSD脚本检测，只需一次很快的分类，而不是两次完整识别
+        language = None
+        try:
+            osd = pytesseract.image_to_osd(img, config='--psm 0')
+            match = re.search(r'Script:\s*(\w+)', osd)
+            if match:
+                language = OSD_SCRIPT_LANGUAGES.get(match.group(1))
+                if language and not os.path.exists(os.path.join(tessdata_path, f"{language}.traineddata")):
+                    language = None
+        except Exception as e:
+            self._log(f"脚本检测失败，改用试识别判断语言: {str(e)}")
+        
+        if language is None:
+            # 简单的语言检测
+            text = pytesseract.image_to_string(img, lang='chi_sim')
+            if len(text.strip()) > 0:
+                language = 'chi_sim'
+            else:
+                text = pytesseract.image_to_string(img, lang='eng')
+                if len(text.strip()) > 0:
+                    language = 'eng'
+                else:
+                    language = 'chi_sim'
+        
+        self._log(f"自动检测语言: {language}")
+        self._detected_language = language
+        return language
+
+    def _load_page(self, image_path):
+        """读取页面图像，有OpenCV时直接解码为可写的numpy数组"""
+        try:
+            import cv2
+            import numpy as np
+        except ImportError:
+            from PIL import Image
+            img = Image.open(image_path)
+            img.load()
+            return img
+        # 用imdecode代替imread以支持中文路径
+        return cv2.imdecode(np.fromfile(image_path, dtype=np.uint8), cv2.IMREAD_GRAYSCALE)
+
+    def _preprocess_image(self, img, arr=None):
+        """应用对比度、亮度（或自适应对比度）、锐化及二值化，arr为页面的可写像素数组时直接在其上处理"""
+        contrast = self.config.get('contrast', 1.0)
+        brightness = self.config.get('brightness', 1.0)
+        # 锐化滑块在100%附近时效果可以忽略，跳过以省去一次整图卷积
+        sharpen = self.config.get('sharpen', 1.0)
+        apply_sharpen = abs(sharpen - 1.0) > 0.05
+        from PIL import Image, ImageEnhance
+
+        try:
+            import cv2
+            import numpy as np
+        except ImportError:
+            if self.config.get('binarize') and not self._warned_no_cv2:
+                self._warned_no_cv2 = True
+                self._log("警告: 未安装OpenCV，二值化改用全局阈值")
+            if self.config.get('adaptive_contrast') and not self._warned_no_clahe:
+                self._warned_no_clahe = True
+                self._log("警告: 未安装OpenCV，自适应对比度改用全局对比度和亮度")
+            if contrast != 1.0 or brightness != 1.0:
+                # 对比度和亮度合并为一张256项查找表，只遍历一次像素
+                histogram = img.histogram()
+                mean = sum((i % 256) * n for i, n in enumerate(histogram)) / (sum(histogram) or 1)
+                lut = [
+                    min(255, max(0, int(((i - mean) * contrast + mean) * brightness + 0.5)))
+                    for i in range(256)
+                ]
+                img = img.point(lut * len(img.getbands()))
+            if apply_sharpen:
+                img = ImageEnhance.Sharpness(img).enhance(sharpen)
+            if self.config.get('binarize') and img.mode == 'L':
+                # 按直方图求Otsu阈值，用查找表一次完成二值化
+                threshold = otsu_threshold(img.histogram())
+                img = img.point([255 if i > threshold else 0 for i in range(256)])
+            return img
+
+        if arr is None:
+            # 复制一次得到可写缓冲区
+            arr = np.array(img, dtype=np.uint8)
+        # 之后的运算都在该缓冲区上原地进行，最后包装为共享内存的PIL图像
+        if self.config.get('adaptive_contrast'):
+            # 按8x8分块做限制对比度的直方图均衡，代替全局的对比度和亮度调整
+            clahe = cv2.createCLAHE(clipLimit=2.0, tileGridSize=(8, 8))
+            clahe.apply(arr, dst=arr)
+        elif contrast != 1.0 or brightness != 1.0:
+            # 与ImageEnhance一致：对比度以灰度均值为中心缩放，亮度整体乘系数，
+            # 两步合并为一张截断到0~255的256项查找表，查表结果直接写回原缓冲区
+            mean = cv2.mean(arr)[0]
+            alpha = contrast * brightness
+            beta = brightness * (1.0 - contrast) * mean
+            lut = np.clip(alpha * np.arange(256) + beta, 0, 255).astype(np.uint8)
+            cv2.LUT(arr, lut, dst=arr)
+        if apply_sharpen:
+            # 与ImageEnhance.Sharpness一致：在原图和平滑图之间按系数插值，合并为一个卷积核
+            kernel = np.array([[1, 1, 1], [1, 5, 1], [1, 1, 1]], dtype=np.float32) / 13
+            kernel *= 1.0 - sharpen
+            kernel[1, 1] += sharpen
+            cv2.filter2D(arr, -1, kernel, dst=arr)
+        if self.config.get('binarize'):
+            # 先做3x3高斯平滑，避免噪点被二值化成孤立的黑点
+            cv2.GaussianBlur(arr, (3, 3), 0, dst=arr)
+            cv2.adaptiveThreshold(
+                arr, 255, cv2.ADAPTIVE_THRESH_GAUSSIAN_C, cv2.THRESH_BINARY, 31, 10, dst=arr)
+        return Image.fromarray(arr)
+
+    def get_cached_result(self, cache_key):
         """获取缓存结果"""
-        # 使用配置的缓存目录
-        settings = QSettings("PDF_OCR", "CacheSettings")
-        cache_dir = settings.value("cache_path", os.path.join(os.path.expanduser('~'), '.pdfocr_cache'))
-        os.makedirs(cache_dir, exist_ok=True)
-        cache_file = os.path.join(cache_dir, f"{cache_key}.txt")
-        
-        if os.path.exists(cache_file):
-            # 检查缓存是否过期（24小时）
-            if os.path.getmtime(cache_file) > (time.time() - 24 * 3600):
-                with open(cache_file, 'r', encoding='utf-8') as f:
-                    return f.read()
+        cache_base = os.path.join(self._cache_dir, cache_key)
+        for suffix in CACHE_READ_SUFFIXES:
+            cache_file = cache_base + suffix
+            try:
+                st = os.stat(cache_file)
+            except FileNotFoundError:
+                continue
+            # 检查缓存是否过期
+            if st.st_mtime <= time.time() - CACHE_EXPIRE_SECONDS:
+                return None
+            try:
+                text = read_cache_file(cache_file, st.st_mtime_ns)
+            except Exception as e:
+                self._log(f"读取缓存失败: {str(e)}")
+                return None
+            try:
+                # 命中时更新访问时间，超过上限时从最久未使用的缓存开始删除；
+                # 修改时间保持不变，有效期仍从写入时算起
+                os.utime(cache_file, ns=(time.time_ns(), st.st_mtime_ns))
+            except OSError:
+                pass
+            return text
         return None
 
-    def _cache_result(self, cache_key, result):
+    def cache_result(self, cache_key, result):
         """缓存结果"""
-        # 使用配置的缓存目录
-        settings = QSettings("PDF_OCR", "CacheSettings")
-        cache_dir = settings.value("cache_path", os.path.join(os.path.expanduser('~'), '.pdfocr_cache'))
-        os.makedirs(cache_dir, exist_ok=True)
-        cache_file = os.path.join(cache_dir, f"{cache_key}.txt")
+        try:
+            self.bytes_written += write_cache_file(os.path.join(self._cache_dir, cache_key), result)
+        except OSError as e:
+            # 缓存写入失败不影响识别结果
+            self._log(f"写入缓存失败: {str(e)}")
+
+    def _get_page_cache_key(self, img):
+        """根据渲染后的页面像素生成单页缓存键"""
+        try:
+            # numpy数组直接按缓冲区计算，不复制像素
+            pixels = memoryview(img)
+        except TypeError:
+            pixels = img.tobytes()
+        page_hash = hashlib.blake2b(pixels, digest_size=16).hexdigest()
+        return f"{self.config_hash()}_{page_hash}"
+
+    def config_hash(self):
+        """识别参数不同结果也不同，参数需要参与缓存键"""
+        # 识别过程中参数不变，每页的缓存键只需计算一次
+        if self._config_hash is None:
+            self._config_hash = hashlib.blake2b(
+                repr(sorted(self.config.items())).encode(), digest_size=8).hexdigest()
+        return self._config_hash
+
+class OCRWorker(QRunnable):
+    def __init__(self, pdf_path, config, verbose=False):
+        super().__init__()
+        self.pdf_path = pdf_path
+        self.config = config
+        self.verbose = verbose
+        self._stop_event = threading.Event()
+        self.settings = QSettings("PDF_OCR", "BaiduAPI")
+        self.images = []  # 添加images属性
+        self._tmp_dir = None
+        self._text_layer = []
+        # 经过OCR的页码（从1开始），未解析页面（如整个文档命中缓存）时为None
+        self.ocr_pages = None
+        self._futures = {}
+        self._executor = None
+        # 子进程写入单页缓存的字节数
+        self._cache_written = 0
+        # 已完成的页数，子进程完成识别时即更新进度，不等待前面的页面
+        self._pages_done = 0
+        self._last_percent = -1
+        self._progress_lock = threading.Lock()
+        self.stats = {
+            'total_pages': 0,
+            'processed_pages': 0,
+            'total_words': 0,
+            'total_lines': 0,
+            'total_chars': 0,
+            'confidence': 0.0
+        }
+        self.signals = OCRSignals()
+        self._log_buffer = []
+        self._log_lock = threading.Lock()
+        self._file_fingerprint = None
+        # 缓存目录只在创建时读取一次，避免每次读写缓存都访问注册表
+        cache_settings = QSettings("PDF_OCR", "CacheSettings")
+        self._cache_dir = cache_settings.value("cache_path", DEFAULT_CACHE_DIR)
+        self._cache_limit = int(cache_settings.value("max_size_mb", DEFAULT_CACHE_LIMIT_MB)) << 20
+        os.makedirs(self._cache_dir, exist_ok=True)
+        # 文档缓存的读写和缓存键与页面识别共用同一套实现
+        self._recognizer = PageRecognizer(config, self._cache_dir, verbose=verbose, log=self._log)
+
+    def _validate_pdf(self):
+        """验证PDF文件"""
+        try:
+            # 检查文件是否存在及文件大小，只stat一次
+            pdf_size = get_file_size(self.pdf_path)
+            if pdf_size < 0:
+                raise ValueError(f"文件不存在: {self.pdf_path}")
+            if pdf_size == 0:
+                raise ValueError("文件为空")
+                
+            # 检查文件格式
+            with open(self.pdf_path, 'rb') as f:
+                header = f.read(4)
+                if header != b'%PDF':
+                    raise ValueError("不是有效的PDF文件")
+                    
+            # 检查文件是否可读
+            try:
+                with open(self.pdf_path, 'rb') as f:
+                    f.read(1)
+            except IOError:
+                raise ValueError("文件无法读取，请检查文件权限")
+                
+            return True
+            
+        except Exception as e:
+            self._log(f"PDF文件验证失败: {str(e)}")
+            raise
+            
+    def _extract_text_layer(self, poppler_path):
+        """用pdftotext读取PDF自带的文字层，返回按页分割的文本列表"""
+        try:
+            result = subprocess.run(
+                [os.path.join(poppler_path, 'pdftotext'), '-layout', '-enc', 'UTF-8',
+                 self.pdf_path, '-'],
+                capture_output=True,
+                timeout=120,
+                creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+            )
+            if result.returncode != 0:
+                return []
+            # pdftotext在每页末尾输出换页符
+            return result.stdout.decode('utf-8', errors='replace').split('\f')
+        except Exception as e:
+            self._log(f"读取文字层失败，全部页面将进行OCR: {str(e)}")
+            return []
+
+    def _render_page(self, poppler_path, dpi, index):
+        """用pdftoppm将单页直接渲染为灰度图像文件，返回文件路径"""
+        output_prefix = os.path.join(self._tmp_dir.name, f"page_{index + 1:05d}")
+        # 输出未压缩的PGM，省去PNG的压缩和解压，临时文件只在本机的磁盘缓存中短暂停留
+        result = subprocess.run(
+            [os.path.join(poppler_path, 'pdftoppm'), '-gray', '-r', str(dpi),
+             '-f', str(index + 1), '-l', str(index + 1), '-singlefile',
+             self.pdf_path, output_prefix],
+            capture_output=True,
+            creationflags=getattr(subprocess, 'CREATE_NO_WINDOW', 0)
+        )
+        if result.returncode != 0:
+            error = result.stderr.decode('utf-8', errors='replace').strip()
+            raise ValueError(f"第 {index+1} 页渲染失败: {error}")
+        return output_prefix + '.pgm'
+
+    def _select_dpi(self, poppler_path, default_dpi):
+        """以低分辨率渲染首页，根据文字高度选择识别DPI"""
+        probe_dpi = 150
+        try:
+            import pytesseract
+            from pdf2image import convert_from_path
+            
+            pages = convert_from_path(
+                self.pdf_path,
+                poppler_path=poppler_path,
+                dpi=probe_dpi,
+                first_page=1,
+                last_page=1,
+                grayscale=True
+            )
+            if not pages:
+                return default_dpi
+            
+            tesseract_path = get_tesseract_path()
+            if tesseract_path:
+                pytesseract.pytesseract.tesseract_cmd = tesseract_path
+            data = pytesseract.image_to_data(
+                pages[0],
+                config='--psm 11',
+                output_type=pytesseract.Output.DICT
+            )
+            heights = sorted(
+                height for height, conf, text in zip(data['height'], data['conf'], data['text'])
+                if text.strip() and float(conf) > 0
+            )
+            if not heights:
+                return default_dpi
+            
+            # Tesseract在文字高度约30像素时识别效果最好
+            median_height = heights[len(heights) // 2]
+            needed_dpi = probe_dpi * 30 / median_height
+            for dpi in (300, 400, 600):
+                if needed_dpi <= dpi:
+                    break
+            self._log(f"自动DPI: 首页文字高度约{median_height}像素({probe_dpi}DPI)，选择{dpi}DPI")
+            return dpi
+        except Exception as e:
+            self._log(f"自动DPI检测失败，使用默认DPI: {str(e)}")
+            return default_dpi
+
+    def _evict_cache(self):
+        """缓存总大小超过上限时删除过期缓存，仍超过上限时从最久未使用的缓存开始删除"""
+        written = self._cache_written + self._recognizer.bytes_written
+        with _cache_usage_lock:
+            usage = _cache_usage.get(self._cache_dir)
+            if usage is not None:
+                usage = _cache_usage[self._cache_dir] = usage + written
+        # 程序启动后首次清理时扫描一次，之后只在累计大小超过上限时扫描
+        if usage is not None and usage <= self._cache_limit:
+            return
+        now = time.time()
+        expire_before = now - CACHE_EXPIRE_SECONDS
+        entries = []
+        total_size = 0
+        try:
+            with os.scandir(self._cache_dir) as it:
+                for entry in it:
+                    if not entry.is_file():
+                        continue
+                    if entry.name.endswith(CACHE_TMP_SUFFIX):
+                        # 其他文档或子进程可能正在写入临时文件，只清理异常退出时的残留
+                        st = entry.stat()
+                        if st.st_mtime <= now - CACHE_TMP_GRACE_SECONDS:
+                            self._remove_cache_file(entry.path)
+                        else:
+                            total_size += st.st_size
+                        continue
+                    if not entry.name.endswith(CACHE_SUFFIXES):
+                        continue
+                    st = entry.stat()
+                    if st.st_mtime <= expire_before:
+                        self._remove_cache_file(entry.path)
+                        continue
+                    entries.append((st.st_atime, st.st_size, entry.path))
+                    total_size += st.st_size
+        except OSError as e:
+            self._log(f"清理缓存失败: {str(e)}")
+            return
         
-        with open(cache_file, 'w', encoding='utf-8') as f:
-            f.write(result)
+        if total_size > self._cache_limit:
+            entries.sort()
+            removed = 0
+            for _, size, path in entries:
+                if total_size <= self._cache_limit:
+                    break
+                if self._remove_cache_file(path):
+                    total_size -= size
+                    removed += 1
+            self._log(f"缓存超过上限，已删除{removed}个最久未使用的缓存文件")
+        with _cache_usage_lock:
+            _cache_usage[self._cache_dir] = total_size
+
+    @staticmethod
+    def _remove_cache_file(path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            # 文件可能正被其他进程读取
+            return False
 
     def _get_cache_key(self):
-        """生成缓存键"""
-        # 使用文件路径和修改时间生成缓存键
-        file_mtime = os.path.getmtime(self.pdf_path)
-        file_info = f"{self.pdf_path}_{file_mtime}"
-        config_hash = hashlib.md5(json.dumps(self.config, sort_keys=True).encode()).hexdigest()
-        return f"{hashlib.md5(file_info.encode()).hexdigest()}_{config_hash}"
+        """生成整个文档的缓存键"""
+        if self._file_fingerprint is None:
+            self._file_fingerprint = self._fingerprint_pdf()
+        return f"{self._file_fingerprint}_{self._recognizer.config_hash()}"
+
+    def _fingerprint_pdf(self):
+        """计算PDF文件指纹"""
+        # 只依赖文件内容，文件改名、复制或仅修改时间变化时缓存仍然有效
+        size = os.path.getsize(self.pdf_path)
+        file_hash = hashlib.blake2b(digest_size=16)
+        with open(self.pdf_path, 'rb') as f:
+            if size > 2 * FINGERPRINT_CHUNK:
+                file_hash.update(f.read(FINGERPRINT_CHUNK))
+                f.seek(-FINGERPRINT_CHUNK, os.SEEK_END)
+                file_hash.update(f.read(FINGERPRINT_CHUNK))
+            else:
+                file_hash.update(f.read())
+        file_hash.update(size.to_bytes(8, 'little'))
+        return file_hash.hexdigest()
 
     def _update_stats(self, text):
         """更新统计信息"""
-        lines = text.split('\n')
-        words = sum(len(line.split()) for line in lines)
-        chars = sum(len(line) for line in lines)
+        lines, words, chars = text_stats(text)
         
-        self.stats['total_lines'] += len(lines)
+        self.stats['total_lines'] += lines
         self.stats['total_words'] += words
         self.stats['total_chars'] += chars
         self.stats['processed_pages'] += 1
@@ -730,17 +1539,11 @@ class OCRWorker(QRunnable):
     def _convert_image_to_qimage(self, img):
         """将PIL图像转换为QImage"""
         try:
+            from PIL import Image
             if isinstance(img, Image.Image):
-                # 确保图像是RGB模式
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                # 转换为字节数据
-                data = img.tobytes('raw', 'RGB')
-                # 创建QImage
-                qimage = QImage(data, img.size[0], img.size[1], QImage.Format_RGB888)
-                return qimage
+                return pil_to_qimage(img)
         except Exception as e:
-            self.log_callback(f"图像转换错误: {str(e)}")
+            self._log(f"图像转换错误: {str(e)}")
         return QImage()
 
     def run(self):
@@ -748,17 +1551,31 @@ class OCRWorker(QRunnable):
         try:
             # 重置缓存使用标记
             self._cache_used = False
+            # 识别失败的页数，有失败页时结果不完整，不写入文档缓存
+            self._failed_pages = 0
+            output_path = os.path.splitext(self.pdf_path)[0] + '_ocr.txt'
             
             # 验证PDF文件
             self._validate_pdf()
             
-            # 检查API配置
+            # 整个文档命中缓存时无需再渲染
+            doc_cache_key = self._get_cache_key()
+            cached_result = self._recognizer.get_cached_result(doc_cache_key)
+            if cached_result:
+                self._log("使用缓存结果")
+                # 与未命中缓存时一样写出结果文件
+                with open(output_path, 'w', encoding='utf-8') as f:
+                    f.write(cached_result)
+                self._finish(cached_result)
+                return
+            
+            # 检查API配置，子进程不读取QSettings，凭据随页面一起传入
+            baidu_credentials = ('', '', '')
             if self.config.get('source') == '百度OCR (在线)':
-                app_id = self.settings.value("app_id", "")
-                api_key = self.settings.value("api_key", "")
-                secret_key = self.settings.value("secret_key", "")
+                baidu_credentials = tuple(
+                    self.settings.value(name, "") for name in ("app_id", "api_key", "secret_key"))
                 
-                if not all([app_id, api_key, secret_key]):
+                if not all(baidu_credentials):
                     raise ValueError("百度OCR API配置不完整，请先配置API信息")
                     
             # 获取Poppler路径
@@ -768,9 +1585,16 @@ class OCRWorker(QRunnable):
                 
             # 转换PDF为图像
             try:
-                self.log_callback("开始转换PDF...")
-                self.log_callback(f"使用DPI: {self.config.get('dpi', 300)}")
-                self.log_callback(f"Poppler路径: {poppler_path}")
+                self._log("开始转换PDF...")
+                dpi = self.config.get('dpi', 300)
+                if self.config.get('auto_dpi'):
+                    dpi = self._select_dpi(poppler_path, dpi)
+                elif self.config.get('downsample') and dpi > 300:
+                    # 直接按300DPI渲染，像素数减少后识别耗时大致按DPI的平方下降，也省去缩放
+                    self._log(f"降采样: {dpi}DPI -> 300DPI")
+                    dpi = 300
+                self._log(f"使用DPI: {dpi}")
+                self._debug(f"Poppler路径: {poppler_path}")
                 
                 # 检查Poppler工具
                 pdfinfo_path = os.path.join(poppler_path, 'pdfinfo.exe')
@@ -779,29 +1603,34 @@ class OCRWorker(QRunnable):
                     
                 # 清空之前的图像
                 self.images = []
-                self.log_callback("已清空之前的图像缓存")
+                self._debug("已清空之前的图像缓存")
                 
-                # 转换PDF为图像
-                self.log_callback("开始转换PDF为图像...")
-                images = convert_from_path(
-                    self.pdf_path,
-                    poppler_path=poppler_path,
-                    dpi=self.config.get('dpi', 300),
-                    thread_count=1  # 使用单线程避免并发问题
-                )
+                # 已有文字层的页面直接取文本，只渲染其余页面
+                from pdf2image import pdfinfo_from_path
+                total_pages = int(pdfinfo_from_path(self.pdf_path, poppler_path=poppler_path)['Pages'])
+                if self.config.get('use_text_layer', True):
+                    text_layer = self._extract_text_layer(poppler_path) + [''] * total_pages
+                else:
+                    text_layer = [''] * total_pages
+                self._text_layer = [
+                    text if len(text.strip()) > TEXT_LAYER_MIN_CHARS else None
+                    for text in text_layer[:total_pages]
+                ]
+                ocr_pages = [i for i in range(total_pages) if self._text_layer[i] is None]
+                self.ocr_pages = {i + 1 for i in ocr_pages}
+                self._log(f"共{total_pages}页，其中{total_pages - len(ocr_pages)}页已有文字层，{len(ocr_pages)}页需要OCR")
                 
-                # 保存图像
-                self.images = images
-                self.log_callback(f"PDF转换完成，共{len(self.images)}页")
-                self.log_callback(f"第一页图像类型: {type(images[0]) if images else '无图像'}")
+                # 页面在识别过程中逐页渲染到临时目录，未渲染和有文字层的页面为None
+                self.images = [None] * total_pages
+                self._tmp_dir = tempfile.TemporaryDirectory(prefix='pdfocr_')
+                self._debug(f"页面图像目录: {self._tmp_dir.name}")
+                self._flush_log()
                 
             except Exception as e:
-                self.log_callback(f"PDF转换错误: {str(e)}")
-                self.log_callback(traceback.format_exc())
+                self._log(f"PDF转换错误: {str(e)}")
+                self._log(traceback.format_exc())
                 raise Exception(f"PDF转换失败: {str(e)}")
                 
-            total_pages = len(self.images)
-            
             # 设置总页数
             self.stats['total_pages'] = total_pages
             
@@ -812,39 +1641,288 @@ class OCRWorker(QRunnable):
             os.makedirs(output_dir, exist_ok=True)
             
             # 处理每一页
-            output_path = os.path.splitext(self.pdf_path)[0] + '_ocr.txt'
-            result_text = ""
+            result_parts = []
+            # 百度OCR有QPS限制，逐页调用；Tesseract在共用进程池的多个子进程中按页并行，
+            # 预处理和识别都不受GIL限制。渲染与识别重叠进行，最多同时保留max_in_flight页未取回的结果
+            if self.config.get('source') == '百度OCR (在线)':
+                max_in_flight = 1
+            else:
+                max_in_flight = get_physical_cpu_count() * 2
+                self._log(f"并行识别进程数: {get_physical_cpu_count()}（按物理核心数，Tesseract内部OpenMP线程数限制为1）")
+            self._executor = get_ocr_pool() if ocr_pages else None
+            pending_pages = deque(ocr_pages)
             with open(output_path, 'w', encoding='utf-8') as f:
-                for i, img in enumerate(self.images):
-                    try:
-                        # 更新进度
-                        self.progress_callback(int((i + 1) / total_pages * 100))
-                        
-                        # 处理页面
-                        if self.config.get('source') == '百度OCR (在线)':
-                            text = self._process_with_baidu(img)
-                        else:
-                            text = self._process_with_tesseract(img)
-                            
-                        if text:
-                            page_text = f"=== 第 {i+1} 页 ===\n{text}\n\n"
-                            f.write(page_text)
-                            result_text += page_text
-                            
-                            # 更新统计信息
-                            stats = self._update_stats(text)
-                            
-                    except Exception as e:
-                        self.log_callback(f"处理第 {i+1} 页时出错: {str(e)}")
-                        continue
+                # 按页码顺序取结果，保证输出和界面中的页面顺序
+                for i in range(total_pages):
+                    if self._stop_event.is_set():
+                        self._cancel_futures()
+                        self._log("识别已取消")
+                        break
+                    # 渲染后续页面并提交识别，子进程只接收页面图像路径，不需要序列化像素数据
+                    while pending_pages and (pending_pages[0] <= i or len(self._futures) < max_in_flight):
+                        page = pending_pages.popleft()
+                        try:
+                            self.images[page] = self._render_page(poppler_path, dpi, page)
+                        except (ValueError, OSError) as e:
+                            # 单页渲染失败时该页留空，继续处理其余页面，取结果时计入失败页数
+                            self._log(f"渲染第 {page+1} 页时出错: {str(e)}")
+                            continue
+                        future = self._submit_page(
+                            self.images[page], doc_cache_key, baidu_credentials)
+                        future.add_done_callback(self._page_completed)
+                        self._futures[page] = future
+                    future = self._futures.pop(i, None)
+                    text = self._collect_page(i, future)
+                    if future is None:
+                        # 使用文字层的页面在此计入进度
+                        self._page_completed()
+                    
+                    if text:
+                        page_text = f"=== 第 {i+1} 页 ===\n{text}\n\n"
+                        f.write(page_text)
+                        result_parts.append(page_text)
+                        self.signals.page_done.emit(i, page_text)
                         
-            self.finished_callback(result_text)  # 传递结果文本
+                        # 更新统计信息
+                        stats = self._update_stats(text)
+                    
+                    # 每页只发送一次日志
+                    self._flush_log()
+            
+            result_text = "".join(result_parts)
+            # 中途取消或有页面失败的结果不完整，不写入文档缓存
+            if self._failed_pages:
+                self._log(f"警告: {self._failed_pages}页识别失败，结果未写入缓存")
+            elif result_text and not self._stop_event.is_set():
+                self._recognizer.cache_result(doc_cache_key, result_text)
+            self._evict_cache()
+            self._finish(result_text)  # 传递结果文本
             
         except Exception as e:
-            self.finished_callback(f"处理PDF时出错: {str(e)}")  # 传递错误信息
+            self._finish(f"处理PDF时出错: {str(e)}")  # 传递错误信息
+        finally:
+            # 出错时取消本文档尚未开始的页面
+            self._cancel_futures()
+            if self._tmp_dir:
+                self._tmp_dir.cleanup()
+                self._tmp_dir = None
+    
+    def _submit_page(self, image_path, doc_cache_key, baidu_credentials):
+        """把一页提交到进程池，进程池已损坏时重新创建后再提交"""
+        args = (_ocr_page_in_process, image_path, doc_cache_key, self.config,
+                self._cache_dir, self.verbose, baidu_credentials)
+        try:
+            return self._executor.submit(*args)
+        except BrokenProcessPool:
+            self._log("识别进程异常退出，重新创建进程池")
+            reset_ocr_pool(self._executor)
+            self._executor = get_ocr_pool()
+            return self._executor.submit(*args)
+    
+    def _collect_page(self, index, future):
+        """取得单页识别结果，有文字层的页面直接返回文字层"""
+        if future is None:
+            text = self._text_layer[index]
+            if text is None:
+                # 需要OCR的页面没有提交识别，说明渲染失败
+                self._log(f"第 {index+1} 页渲染失败，结果留空")
+                self._failed_pages += 1
+            else:
+                self._debug(f"第 {index+1} 页使用文字层")
+            return text
+        
+        try:
+            text, logs, written = future.result()
+            self._cache_written += written
+            with self._log_lock:
+                self._log_buffer.extend(logs)
+            # 识别器出错时已记录日志并返回None，空白页返回空字符串
+            if text is None:
+                self._failed_pages += 1
+            return text
+        except BrokenProcessPool:
+            # 子进程异常退出，后续页面提交到新的进程池
+            self._log(f"处理第 {index+1} 页时出错: 识别进程异常退出")
+            self._failed_pages += 1
+            reset_ocr_pool(self._executor)
+            return None
+        except Exception as e:
+            self._log(f"处理第 {index+1} 页时出错: {str(e)}")
+            self._failed_pages += 1
+            return None
+        finally:
+            # 识别完成后立即删除本页临时文件
+            self._remove_page_file(index)
+    
+    def _page_completed(self, future=None):
+        """一页处理完成时更新进度，可能在进程池的回调线程中调用"""
+        if future is not None and future.cancelled():
+            return
+        with self._progress_lock:
+            self._pages_done += 1
+            percent = int(self._pages_done / self.stats['total_pages'] * 100)
+            # 百分比不变时不发送信号
+            if percent == self._last_percent:
+                return
+            self._last_percent = percent
+        self.signals.progress.emit(percent)
+    
+    def _remove_page_file(self, index):
+        """删除已处理页面的临时图像"""
+        if self.images[index] is None:
+            return
+        try:
+            os.remove(self.images[index])
+        except OSError:
+            pass
+        self.images[index] = None
+    
+    def _log(self, message):
+        """缓存日志，由_flush_log统一发送"""
+        with self._log_lock:
+            self._log_buffer.append(message)
+    
+    def _debug(self, message):
+        """每页的处理步骤，只在开启详细日志时显示"""
+        if self.verbose:
+            self._log(message)
+    
+    def _flush_log(self):
+        """一次性发送缓存的日志"""
+        with self._log_lock:
+            buffer, self._log_buffer = self._log_buffer, []
+        if buffer:
+            self.signals.log_batch.emit(buffer)
+    
+    def _finish(self, result):
+        self._flush_log()
+        self.signals.finished.emit(result)
+    
+    def _cancel_futures(self):
+        for future in list(self._futures.values()):
+            future.cancel()
+        self._futures.clear()
+    
+    def is_stopped(self):
+        return self._stop_event.is_set()
+    
+    def disconnect_signals(self):
+        """取消后断开界面连接，旧任务退出前发出的信号不再写入新的识别"""
+        for signal in (self.signals.log_batch, self.signals.progress,
+                       self.signals.page_done, self.signals.finished):
+            try:
+                signal.disconnect()
+            except TypeError:
+                # 没有连接时disconnect会抛出TypeError
+                pass
     
     def stop(self):
         self._stop_event.set()
+        # 进程池是共用的，只取消本文档排队中的页面
+        for future in list(self._futures.values()):
+            future.cancel()
+
+# 页面识别进程池，整个程序共用，首次识别时创建
+_ocr_pool = None
+_ocr_pool_lock = threading.Lock()
+
+def get_ocr_pool():
+    """获取共用的页面识别进程池"""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is None:
+            # Tesseract是计算密集型，超线程帮助不大，每个物理核心只跑一个单线程引擎
+            _ocr_pool = ProcessPoolExecutor(
+                max_workers=get_physical_cpu_count(),
+                initializer=_init_ocr_process
+            )
+        return _ocr_pool
+
+def reset_ocr_pool(pool):
+    """子进程异常退出后进程池不可再用，丢弃后由get_ocr_pool重新创建"""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        # 多个文档可能同时发现同一个进程池损坏，只丢弃一次
+        if _ocr_pool is pool:
+            _ocr_pool = None
+    pool.shutdown(wait=False, cancel_futures=True)
+
+def shutdown_ocr_pool():
+    """退出程序时关闭进程池，排队中的页面不再识别，子进程中常驻的Tesseract引擎随之释放"""
+    global _ocr_pool
+    with _ocr_pool_lock:
+        if _ocr_pool is not None:
+            _ocr_pool.shutdown(wait=False, cancel_futures=True)
+            _ocr_pool = None
+
+# 以下变量只在页面识别子进程中使用：每个文档一个识别器，引擎池在进程内一直复用
+_process_recognizers = {}
+_process_api_pool = None
+
+def _init_ocr_process():
+    """页面识别子进程初始化"""
+    global _process_api_pool
+    # 并行度由进程数决定，每个进程只跑一个单线程引擎
+    os.environ['OMP_THREAD_LIMIT'] = '1'
+    _process_api_pool = TesseractAPIPool(size=1)
+    # 子进程不执行atexit，用multiprocessing的退出回调在进程池关闭时释放常驻引擎
+    from multiprocessing.util import Finalize
+    Finalize(None, _process_api_pool.close, exitpriority=10)
+
+def _ocr_page_in_process(image_path, doc_cache_key, config, cache_dir, verbose, baidu_credentials):
+    """在子进程中识别一页，返回识别文本和产生的日志"""
+    # 文档缓存键包含文件指纹和识别参数，同名文件内容改变后不会沿用上次检测的语言
+    key = (doc_cache_key, verbose, baidu_credentials)
+    recognizer = _process_recognizers.get(key)
+    if recognizer is None:
+        # 批量处理时多个文档的页面交替到达，只保留最近的几个识别器
+        if len(_process_recognizers) >= 8:
+            _process_recognizers.clear()
+        recognizer = _process_recognizers[key] = PageRecognizer(
+            config, cache_dir, api_pool=_process_api_pool, verbose=verbose,
+            baidu_credentials=baidu_credentials)
+    written = recognizer.bytes_written
+    text = recognizer.recognize_page(image_path)
+    return text, recognizer.take_logs(), recognizer.bytes_written - written
+
+class CacheMoveSignals(QObject):
+    progress = pyqtSignal(int, int)
+    finished = pyqtSignal(str)
+
+class CacheMoveTask(QRunnable):
+    """在线程池中移动缓存文件，避免移动期间界面无响应"""
+    def __init__(self, src_dir, dst_dir):
+        super().__init__()
+        self.src_dir = src_dir
+        self.dst_dir = dst_dir
+        self.signals = CacheMoveSignals()
+
+    def run(self):
+        try:
+            os.makedirs(self.dst_dir, exist_ok=True)
+            # 同一磁盘上只需重命名，不必复制文件内容
+            same_volume = os.stat(self.src_dir).st_dev == os.stat(self.dst_dir).st_dev
+            with os.scandir(self.src_dir) as entries:
+                names = [entry.name for entry in entries]
+            
+            total = len(names)
+            for i, name in enumerate(names, 1):
+                src = os.path.join(self.src_dir, name)
+                dst = os.path.join(self.dst_dir, name)
+                if same_volume:
+                    os.replace(src, dst)
+                else:
+                    shutil.move(src, dst)
+                # 每50个文件更新一次进度
+                if i % 50 == 0 or i == total:
+                    self.signals.progress.emit(i, total)
+            
+            # 删除旧目录
+            if not os.listdir(self.src_dir):
+                os.rmdir(self.src_dir)
+            self.signals.finished.emit("")
+        except Exception as e:
+            self.signals.finished.emit(str(e))
 
 class CacheSettingsDialog(QDialog):
     def __init__(self, parent=None):
@@ -854,7 +1932,7 @@ class CacheSettingsDialog(QDialog):
         
         # 加载设置
         self.settings = QSettings("PDF_OCR", "CacheSettings")
-        self.default_cache_path = os.path.join(os.path.expanduser('~'), '.pdfocr_cache')
+        self.default_cache_path = DEFAULT_CACHE_DIR
         self.cache_path = self.settings.value("cache_path", self.default_cache_path)
         
         layout = QVBoxLayout()
@@ -881,6 +1959,24 @@ class CacheSettingsDialog(QDialog):
         info_layout.addWidget(QLabel("缓存大小:"))
         info_layout.addWidget(self.cache_size_label)
         
+        # 缓存上限，超过后识别完成时删除最早的缓存
+        limit_layout = QHBoxLayout()
+        self.cache_limit_spin = QSpinBox()
+        self.cache_limit_spin.setRange(50, 10240)
+        self.cache_limit_spin.setSuffix(" MB")
+        self.cache_limit_spin.setValue(int(self.settings.value("max_size_mb", DEFAULT_CACHE_LIMIT_MB)))
+        self.cache_limit_spin.valueChanged.connect(
+            lambda v: self.settings.setValue("max_size_mb", v))
+        limit_layout.addWidget(QLabel("缓存上限:"))
+        limit_layout.addWidget(self.cache_limit_spin)
+        info_layout.addLayout(limit_layout)
+        
+        # 移动缓存进度
+        self.move_progress = QProgressBar()
+        self.move_progress.hide()
+        info_layout.addWidget(self.move_progress)
+        self._move_task = None
+        
         info_group.setLayout(info_layout)
         
         # 操作按钮组
@@ -904,9 +2000,9 @@ class CacheSettingsDialog(QDialog):
         layout.addWidget(button_group)
         
         # 添加关闭按钮
-        close_button = QPushButton("关闭")
-        close_button.clicked.connect(self.accept)
-        layout.addWidget(close_button)
+        self.close_button = QPushButton("关闭")
+        self.close_button.clicked.connect(self.accept)
+        layout.addWidget(self.close_button)
         
         self.setLayout(layout)
         
@@ -948,36 +2044,62 @@ class CacheSettingsDialog(QDialog):
                 )
                 
                 if reply == QMessageBox.Yes:
-                    try:
-                        # 创建新目录
-                        os.makedirs(new_path, exist_ok=True)
-                        
-                        # 移动文件
-                        for file in os.listdir(self.cache_path):
-                            src = os.path.join(self.cache_path, file)
-                            dst = os.path.join(new_path, file)
-                            shutil.move(src, dst)
-                        
-                        # 删除旧目录
-                        if not os.listdir(self.cache_path):
-                            os.rmdir(self.cache_path)
-                    except Exception as e:
-                        QMessageBox.warning(
-                            self,
-                            "错误",
-                            f"移动缓存文件时出错：\n{str(e)}"
-                        )
-                        return
-            
-            # 更新路径
-            self.cache_path = new_path
-            self.cache_path_label.setText(self.cache_path)
-            
-            # 保存设置
-            self.settings.setValue("cache_path", self.cache_path)
+                    self._start_cache_move(new_path)
+                    return
             
-            # 更新缓存信息
+            self._apply_cache_path(new_path)
+    
+    def _start_cache_move(self, new_path):
+        """在后台移动缓存文件，完成后再切换路径"""
+        self._set_buttons_enabled(False)
+        self.move_progress.setValue(0)
+        self.move_progress.show()
+        
+        self._move_task = CacheMoveTask(self.cache_path, new_path)
+        self._move_task.signals.progress.connect(self._cache_move_progress)
+        self._move_task.signals.finished.connect(partial(self._cache_move_finished, new_path))
+        QThreadPool.globalInstance().start(self._move_task)
+    
+    def _cache_move_progress(self, done, total):
+        self.move_progress.setMaximum(total)
+        self.move_progress.setValue(done)
+    
+    def _cache_move_finished(self, new_path, error):
+        self._move_task = None
+        self.move_progress.hide()
+        self._set_buttons_enabled(True)
+        if error:
+            QMessageBox.warning(
+                self,
+                "错误",
+                f"移动缓存文件时出错：\n{error}"
+            )
+            # 已移动的文件留在新目录中，刷新旧目录的大小
             self.update_cache_info()
+            return
+        self._apply_cache_path(new_path)
+    
+    def _apply_cache_path(self, new_path):
+        """切换到新的缓存路径"""
+        # 更新路径
+        self.cache_path = new_path
+        self.cache_path_label.setText(self.cache_path)
+        
+        # 保存设置
+        self.settings.setValue("cache_path", self.cache_path)
+        
+        # 更新缓存信息
+        self.update_cache_info()
+    
+    def _set_buttons_enabled(self, enabled):
+        for button in (self.change_path_button, self.reset_path_button,
+                       self.open_folder_button, self.clear_cache_button, self.close_button):
+            button.setEnabled(enabled)
+    
+    def reject(self):
+        # 移动缓存期间不允许关闭对话框
+        if self._move_task is None:
+            super().reject()
     
     def reset_cache_path(self):
         """恢复默认缓存路径"""
@@ -1009,12 +2131,9 @@ class CacheSettingsDialog(QDialog):
     def update_cache_info(self):
         """更新缓存信息显示"""
         if os.path.exists(self.cache_path):
-            # 计算缓存大小
-            total_size = 0
-            for root, dirs, files in os.walk(self.cache_path):
-                for file in files:
-                    file_path = os.path.join(root, file)
-                    total_size += os.path.getsize(file_path)
+            # 计算缓存大小（缓存目录没有子目录，scandir的条目自带文件信息，无需逐个stat）
+            with os.scandir(self.cache_path) as entries:
+                total_size = sum(entry.stat().st_size for entry in entries if entry.is_file())
             
             # 格式化显示大小
             if total_size < 1024:
@@ -1092,14 +2211,24 @@ class MainWindow(QMainWindow):
         self.setCentralWidget(main_widget)
         main_layout = QHBoxLayout()
         
-        # 添加线程池
+        # 添加线程池：批量处理时每个文件占一个线程负责渲染和收集结果，
+        # 识别本身在共用的进程池中进行；留一个核心给界面。
+        # 依赖检查、保存最近文件等辅助任务在全局线程池中运行，不排在文档后面
         self.thread_pool = QThreadPool()
-        self.thread_pool.setMaxThreadCount(4)
+        self.thread_pool.setMaxThreadCount(max(1, (os.cpu_count() or 2) - 1))
+        QApplication.instance().aboutToQuit.connect(shutdown_ocr_pool)
+        
+        # 最近文件列表在后台保存，退出前写入尚未保存的数据
+        self._recent_save_task = JsonSaveTask('recent_files.json')
+        QApplication.instance().aboutToQuit.connect(self._recent_save_task.run)
         
         # 创建信号对象
         self.signals = OCRSignals()
         
         # 创建左侧面板（历史记录和最近文件）
+        # 列表内容由模型提供，刷新时只需整体替换字符串列表
+        self._history_model = QStringListModel(self)
+        self._recent_model = QStringListModel(self)
         left_panel = QWidget()
         left_layout = QVBoxLayout()
         
@@ -1109,8 +2238,10 @@ class MainWindow(QMainWindow):
         # 历史记录标签页
         history_tab = QWidget()
         history_layout = QVBoxLayout()
-        self.history_list = QListWidget()
-        self.history_list.itemClicked.connect(self.load_history_item)
+        self.history_list = QListView()
+        self.history_list.setModel(self._history_model)
+        self.history_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.history_list.clicked.connect(self.load_history_item)
         self.history_list.setMinimumWidth(300)
         self.history_list.setMaximumWidth(400)
         self.history_list.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -1121,8 +2252,10 @@ class MainWindow(QMainWindow):
         # 最近文件标签页
         recent_tab = QWidget()
         recent_layout = QVBoxLayout()
-        self.recent_list = QListWidget()
-        self.recent_list.itemClicked.connect(self.load_recent_file)
+        self.recent_list = QListView()
+        self.recent_list.setModel(self._recent_model)
+        self.recent_list.setEditTriggers(QAbstractItemView.NoEditTriggers)
+        self.recent_list.clicked.connect(self.load_recent_file)
         self.recent_list.setMinimumWidth(300)
         self.recent_list.setMaximumWidth(400)
         self.recent_list.setContextMenuPolicy(Qt.CustomContextMenu)
@@ -1232,39 +2365,19 @@ class MainWindow(QMainWindow):
         self.progress_bar.setVisible(False)
         
         # 创建日志显示区域
-        self.log_text = QTextEdit()
+        # 日志只追加纯文本行，QPlainTextEdit布局开销小，并限制保留的行数
+        self.log_text = QPlainTextEdit()
         self.log_text.setReadOnly(True)
+        self.log_text.setMaximumBlockCount(MAX_LOG_LINES)
         self.log_text.setMinimumHeight(200)
         self.log_text.setMaximumHeight(300)
-        self.log_text.setStyleSheet("""
-            QTextEdit {
-                background-color: #f5f5f5;
-                color: #333333;
-                font-family: 'Consolas', 'Courier New', monospace;
-                font-size: 12px;
-                line-height: 1.5;
-                border: 1px solid #cccccc;
-                border-radius: 4px;
-                padding: 8px;
-            }
-            QScrollBar:vertical {
-                border: none;
-                background: #f5f5f5;
-                width: 10px;
-                margin: 0px;
-            }
-            QScrollBar::handle:vertical {
-                background: #cccccc;
-                min-height: 20px;
-                border-radius: 5px;
-            }
-            QScrollBar::add-line:vertical, QScrollBar::sub-line:vertical {
-                height: 0px;
-            }
-            QScrollBar::add-page:vertical, QScrollBar::sub-page:vertical {
-                background: none;
-            }
-        """)
+        # 日志先缓存，由定时器每100ms一次性写入
+        self._log_buf = deque(maxlen=MAX_LOG_LINES)
+        self._log_timer = QTimer(self)
+        self._log_timer.setInterval(LOG_FLUSH_INTERVAL_MS)
+        self._log_timer.timeout.connect(self._flush_log_buffer)
+        self._log_timer.start()
+        self.log_text.setStyleSheet(LIGHT_LOG_QSS)
         
         # 创建日志标题栏
         log_header = QWidget()
@@ -1287,6 +2400,10 @@ class MainWindow(QMainWindow):
         log_title.setStyleSheet("color: #333333; font-weight: bold;")
         log_header_layout.addWidget(log_title)
         
+        # 详细日志：显示每页的处理步骤
+        self.verbose_log_check = QCheckBox("详细日志")
+        log_header_layout.addWidget(self.verbose_log_check)
+        
         # 添加清除按钮
         clear_button = QPushButton("清除")
         clear_button.setStyleSheet("""
@@ -1301,7 +2418,7 @@ class MainWindow(QMainWindow):
                 background-color: #4c4c4c;
             }
         """)
-        clear_button.clicked.connect(self.log_text.clear)
+        clear_button.clicked.connect(self._clear_log)
         log_header_layout.addWidget(clear_button)
         
         log_header.setLayout(log_header_layout)
@@ -1322,10 +2439,13 @@ class MainWindow(QMainWindow):
         log_container.setLayout(log_layout)
         
         # 创建结果显示区域
-        self.result_text = QTextEdit()
+        # 识别结果是纯文本，QPlainTextEdit按行存储，长文档占用的内存少得多。
+        # 复制、导出和校对都从结果窗口取文本，不限制行数，避免丢掉前面的页面
+        self.result_text = QPlainTextEdit()
+        self.result_text.setLineWrapMode(QPlainTextEdit.NoWrap)
         self.result_text.setReadOnly(False)
         self.result_text.setStyleSheet("""
-            QTextEdit {
+            QPlainTextEdit {
                 font-family: 'Consolas', 'Courier New', monospace;
             }
         """)
@@ -1357,22 +2477,38 @@ class MainWindow(QMainWindow):
         main_widget.setLayout(main_layout)
         
         self.ocr_thread = None
-        self.history = []
+        self._streamed_pages = []
+        # 当前结果中经过OCR的页码，校对时只在这些页合并重复空格
+        self._ocr_pages = None
+        self.history = deque(maxlen=MAX_HISTORY)
         self.recent_files = []
+        # 最近文件的大小，只在添加或首次显示时读取
+        self._recent_sizes = {}
         
         # 加载设置
-        self.settings = QSettings("PDF_OCR", "Settings")
+        # 设置读写走内存缓存，修改后延迟写入，退出前写入剩余的修改
+        self.settings = CachedSettings(QSettings("PDF_OCR", "Settings"), self)
+        QApplication.instance().aboutToQuit.connect(self.settings.sync)
         self.load_settings()
         
+        self.verbose_log_check.setChecked(self.settings.value("verbose_log", False, type=bool))
+        self.verbose_log_check.toggled.connect(
+            lambda checked: self.settings.setValue("verbose_log", checked))
+        
         # 加载OCR配置
         self.ocr_config = self.settings.value("ocr_config", {
             'language': '中文 (chi_sim)',
             'oem': 1,  # 使用LSTM模式，速度更快
             'psm': 3,  # 全自动页面分割，无方向检测
             'dpi': 300,  # 降低DPI以提高速度
+            'auto_dpi': False,
+            'downsample': False,
             'contrast': 1.0,
             'brightness': 1.0,
-            'sharpen': 1.0
+            'sharpen': 1.0,
+            'binarize': False,
+            'adaptive_contrast': False,
+            'use_text_layer': True
         })
         
         # 加载自动保存设置
@@ -1383,33 +2519,45 @@ class MainWindow(QMainWindow):
             'auto_create_dir': True
         })
         
-        self.load_history()
-        self.load_recent_files()
-        
         # 启用拖放
         self.setAcceptDrops(True)
         
-        # 检查依赖
-        errors = check_dependencies()
-        if errors:
-            error_msg = "程序初始化失败:\n" + "\n".join(errors)
-            QMessageBox.critical(self, "错误", error_msg)
-            self.select_button.setEnabled(False)
-            self.select_multiple_button.setEnabled(False)
-            self.result_text.setText(error_msg)
+        # 在后台检查依赖，检查完成前禁用识别按钮
+        self.select_button.setEnabled(False)
+        self.select_multiple_button.setEnabled(False)
+        self.dependency_task = DependencyCheckTask()
+        self.dependency_task.signals.finished.connect(self._dependencies_checked)
+        QThreadPool.globalInstance().start(self.dependency_task)
         
         # 连接信号
         self.signals.log.connect(self._update_log)
-        self.signals.progress.connect(self._update_progress)
-        self.signals.finished.connect(self._ocr_finished)
         
-        # 创建系统托盘图标
-        self.create_tray_icon()
+        # 系统托盘图标和历史记录在窗口首次显示后再创建
+        self.tray_icon = None
+        QTimer.singleShot(0, self._post_init)
         
         # 添加校对窗口
         self.proofread_dialog = None
         
         # 添加状态栏
+        self.statusBar().showMessage("正在检查依赖...")
+    
+    def _post_init(self):
+        """事件循环开始后再执行的初始化，使窗口尽快显示"""
+        self.create_tray_icon()
+        self.load_history()
+        self.load_recent_files()
+    
+    def _dependencies_checked(self, errors):
+        """依赖检查完成"""
+        if errors:
+            error_msg = "程序初始化失败:\n" + "\n".join(errors)
+            QMessageBox.critical(self, "错误", error_msg)
+            self.result_text.setPlainText(error_msg)
+            self.statusBar().showMessage("依赖缺失")
+            return
+        self.select_button.setEnabled(True)
+        self.select_multiple_button.setEnabled(True)
         self.statusBar().showMessage("就绪")
     
     def load_settings(self):
@@ -1438,41 +2586,28 @@ class MainWindow(QMainWindow):
     def apply_theme(self):
         """应用主题"""
         stylesheet = self.theme_manager.get_theme_stylesheet(self.current_theme)
+        # 样式表未变化时不重新解析
+        if stylesheet == self.styleSheet():
+            return
+        # 暂停重绘，样式全部更新后只重绘一次
+        self.setUpdatesEnabled(False)
         self.setStyleSheet(stylesheet)
         
         # 更新日志窗口样式
-        if self.current_theme == "深色":
-            self.log_text.setStyleSheet("""
-                QTextEdit {
-                    background-color: #323232;
-                    color: #ffffff;
-                    font-family: 'Consolas', 'Courier New', monospace;
-                    font-size: 12px;
-                    line-height: 1.5;
-                    border: 1px solid #555555;
-                    border-radius: 4px;
-                    padding: 8px;
-                }
-            """)
-        else:
-            self.log_text.setStyleSheet("""
-                QTextEdit {
-                    background-color: #f5f5f5;
-                    color: #333333;
-                    font-family: 'Consolas', 'Courier New', monospace;
-                    font-size: 12px;
-                    line-height: 1.5;
-                    border: 1px solid #cccccc;
-                    border-radius: 4px;
-                    padding: 8px;
-                }
-            """)
+        self.log_text.setStyleSheet(DARK_LOG_QSS if self.current_theme == "深色" else LIGHT_LOG_QSS)
+        self.setUpdatesEnabled(True)
     
-    def toggle_theme(self):
-        self.current_theme = "深色" if self.current_theme == "浅色" else "浅色"
+    def set_theme(self, theme):
+        """切换主题，所有主题变化都经过apply_theme"""
+        if theme == self.current_theme:
+            return
+        self.current_theme = theme
         self.apply_theme()
         self.save_settings()
     
+    def toggle_theme(self):
+        self.set_theme("深色" if self.current_theme == "浅色" else "浅色")
+    
     def create_tray_icon(self):
         self.tray_icon = QSystemTrayIcon(self)
         # 使用icon.ico作为托盘图标
@@ -1502,8 +2637,9 @@ class MainWindow(QMainWindow):
     def closeEvent(self, event):
         # 保存设置
         self.save_settings()
+        self.settings.sync()
         # 最小化到托盘
-        if self.tray_icon.isVisible():
+        if self.tray_icon is not None and self.tray_icon.isVisible():
             self.hide()
             event.ignore()
         else:
@@ -1514,74 +2650,164 @@ class MainWindow(QMainWindow):
             event.acceptProposedAction()
     
     def dropEvent(self, event: QDropEvent):
-        files = [url.toLocalFile() for url in event.mimeData().urls()]
-        pdf_files = [f for f in files if f.lower().endswith('.pdf')]
+        # 只对扩展名做小写转换，不复制整个路径
+        pdf_files = [
+            path for path in (url.toLocalFile() for url in event.mimeData().urls())
+            if os.path.splitext(path)[1].lower() == '.pdf'
+        ]
         if pdf_files:
             if len(pdf_files) == 1:
                 self.start_ocr(pdf_files[0])
             else:
                 self.batch_process_pdfs(pdf_files)
     
+    def _open_history_db(self):
+        """打开历史记录数据库，使用WAL日志使追加记录不必重写整个文件"""
+        db = sqlite3.connect(HISTORY_DB, isolation_level=None)
+        db.execute("PRAGMA journal_mode=WAL")
+        db.execute("PRAGMA synchronous=NORMAL")
+        db.execute(
+            "CREATE TABLE IF NOT EXISTS history("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, time TEXT, filename TEXT UNIQUE, "
+            "result TEXT, lines INT, words INT, chars INT, size INT)"
+        )
+        return db
+    
     def load_history(self):
+        """读取最近的历史记录，不读取识别结果"""
+        self._history_db = self._open_history_db()
+        # 导入完成的标记与导入的记录在同一事务中写入，中途退出后下次启动会重新导入
+        version = self._history_db.execute("PRAGMA user_version").fetchone()[0]
+        if version < HISTORY_DB_VERSION:
+            self._migrate_history()
+        
+        rows = self._history_db.execute(
+            "SELECT id, time, filename, size, lines, words, chars FROM history "
+            "ORDER BY id DESC LIMIT ?", (MAX_HISTORY,)
+        ).fetchall()
+        self.history = deque((dict(zip(HISTORY_FIELDS, row)) for row in reversed(rows)),
+                             maxlen=MAX_HISTORY)
+        self.update_history_list()
+    
+    def _migrate_history(self):
+        """把旧版JSON历史记录导入数据库"""
+        items = {}
+        legacy_files = (HISTORY_FILE, LEGACY_HISTORY_FILE)
         try:
-            with open('history.json', 'r', encoding='utf-8') as f:
-                self.history = json.load(f)
-                self.update_history_list()
+            with open(HISTORY_FILE, 'rb') as f:
+                for line in f:
+                    if not line.strip():
+                        continue
+                    try:
+                        record = load_json_line(line)
+                    except ValueError:
+                        # 忽略写入中断留下的残行
+                        continue
+                    if 'deleted' in record:
+                        items.pop(record['deleted'], None)
+                    else:
+                        items[record['filename']] = record
         except FileNotFoundError:
-            self.history = []
+            try:
+                with open(LEGACY_HISTORY_FILE, 'r', encoding='utf-8') as f:
+                    for item in json.load(f):
+                        items[item['filename']] = item
+            except FileNotFoundError:
+                pass
+            except ValueError as e:
+                # 文件已损坏时保留原文件，不影响程序启动
+                self._update_log(f"旧版历史记录文件已损坏，未导入: {str(e)}")
+                items.clear()
+                legacy_files = (HISTORY_FILE,)
+        
+        # 旧记录可能没有文件大小，批量读取
+        sizes = file_sizes([os.path.join(_APP_DIR, filename)
+                            for filename, item in items.items() if 'size' not in item])
+        self._history_db.execute("BEGIN")
+        for item in items.values():
+            result = item.pop('result', None)
+            if result is None:
+                try:
+                    with open(item['result_path'], 'r', encoding='utf-8') as f:
+                        result = f.read()
+                except (KeyError, OSError):
+                    continue
+            if 'size' not in item:
+                item['size'] = max(sizes[os.path.join(_APP_DIR, item['filename'])], 0)
+            self._insert_history(item, result)
+        self._history_db.execute(f"PRAGMA user_version={HISTORY_DB_VERSION}")
+        self._history_db.execute("COMMIT")
+        
+        # 导入完成后删除旧文件
+        for path in legacy_files:
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+        shutil.rmtree(HISTORY_DIR, ignore_errors=True)
     
-    def save_history(self):
-        with open('history.json', 'w', encoding='utf-8') as f:
-            json.dump(self.history, f, ensure_ascii=False, indent=2)
+    def _insert_history(self, item, result):
+        """写入一条历史记录，同一文件的旧记录被替换并获得新的id"""
+        item['lines'], item['words'], item['chars'] = text_stats(result)
+        cursor = self._history_db.execute(
+            "INSERT OR REPLACE INTO history(time, filename, result, lines, words, chars, size) "
+            "VALUES(?, ?, ?, ?, ?, ?, ?)",
+            (item['time'], item['filename'], result,
+             item['lines'], item['words'], item['chars'], item['size'])
+        )
+        item['id'] = cursor.lastrowid
+    
+    def _history_file_size(self, filename):
+        return max(get_file_size(os.path.join(_APP_DIR, filename)), 0)
+    
+    def _history_display_text(self, item):
+        # 文件大小在添加记录时已缓存
+        file_size = item.get('size', 0)
+        file_size_str = f"{file_size/1024:.1f}KB" if file_size < 1024*1024 else f"{file_size/1024/1024:.1f}MB"
+        
+        # 文本统计信息在添加记录时已计算
+        return (
+            f"📄 {item['filename']}\n"
+            f"⏰ {item['time']}\n"
+            f"📊 {file_size_str} | {item.get('lines', 0)}行 | {item.get('words', 0)}字 | {item.get('chars', 0)}字符"
+        )
     
     def update_history_list(self):
-        self.history_list.clear()
-        for item in reversed(self.history):
-            # 获取文件大小
-            file_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), item['filename'])
-            file_size = os.path.getsize(file_path) if os.path.exists(file_path) else 0
-            file_size_str = f"{file_size/1024:.1f}KB" if file_size < 1024*1024 else f"{file_size/1024/1024:.1f}MB"
-            
-            # 获取文本统计信息
-            text = item['result']
-            lines = len(text.split('\n'))
-            words = sum(len(line.split()) for line in text.split('\n'))
-            chars = len(text)
-            
-            # 格式化显示
-            display_text = (
-                f"📄 {item['filename']}\n"
-                f"⏰ {item['time']}\n"
-                f"📊 {file_size_str} | {lines}行 | {words}字 | {chars}字符"
-            )
-            self.history_list.addItem(display_text)
+        self._history_model.setStringList(
+            [self._history_display_text(item) for item in reversed(self.history)])
     
     def add_to_history(self, filename, result):
         """添加到历史记录"""
-        # 检查是否已存在相同文件的历史记录
+        # 同一文件的旧记录移到最前
         for item in self.history:
             if item['filename'] == filename:
-                # 更新现有记录的时间和结果
-                item['time'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-                item['result'] = result
-                self.save_history()
-                self.update_history_list()
-                return
-                
-        # 如果是新文件，添加新记录
+                self.history.remove(item)
+                break
+        
         history_item = {
             'time': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
             'filename': filename,
-            'result': result
+            'size': self._history_file_size(filename)
         }
+        self._insert_history(history_item, result)
+        # 超出上限被挤出的记录同时从数据库删除
+        if len(self.history) == self.history.maxlen:
+            self._history_db.execute("DELETE FROM history WHERE id = ?", (self.history[0]['id'],))
         self.history.append(history_item)
-        self.save_history()
         self.update_history_list()
     
-    def load_history_item(self, item):
-        index = self.history_list.row(item)
+    def load_history_item(self, model_index):
+        index = model_index.row()
         history_item = self.history[-(index + 1)]
-        self.result_text.setText(history_item['result'])
+        # 识别结果在需要时才从数据库读取
+        row = self._history_db.execute(
+            "SELECT result FROM history WHERE id = ?", (history_item['id'],)
+        ).fetchone()
+        if row is None:
+            QMessageBox.warning(self, "错误", "找不到该记录的识别结果")
+            return
+        self.result_text.setPlainText(row[0])
+        self._ocr_pages = None
         self.copy_button.setEnabled(True)
         self.export_button.setEnabled(True)
         self.proofread_button.setEnabled(True)
@@ -1591,30 +2817,28 @@ class MainWindow(QMainWindow):
         try:
             self.signals.log.emit("开始准备文本校对...")
             
-            if not hasattr(self, 'current_result') or not self.current_result:
+            # 只取一次全文
+            text = self.result_text.toPlainText()
+            if not text.strip():
                 self.signals.log.emit("错误：没有可校对的文本")
                 QMessageBox.warning(self, "错误", "没有可校对的文本")
                 return
                 
-            if not hasattr(self, 'images') or not self.images:
-                self.signals.log.emit("错误：没有可用的图像")
-                QMessageBox.warning(self, "错误", "没有可用的图像")
-                return
-                
             self.signals.log.emit("创建校对对话框...")
             dialog = ProofreadDialog(self)
             
             self.signals.log.emit("设置校对文本...")
-            dialog.set_text(self.current_result)
-            
-            self.signals.log.emit("设置校对图像...")
-            dialog.set_images(self.images)
+            dialog.set_text(clean_ocr_text(text, self._ocr_pages))
+            # 页面图像在每页识别完成后即删除，只校对文本
+            dialog.set_images([])
             
             self.signals.log.emit("显示校对对话框...")
             if dialog.exec_() == QDialog.Accepted:
                 self.signals.log.emit("保存校对结果...")
-                self.current_result = dialog.get_text()
-                self.text_edit.setText(self.current_result)
+                proofread = dialog.get_text()
+                # 内容未改动时不重建结果文档
+                if proofread != text:
+                    self.result_text.setPlainText(proofread)
                 self.signals.log.emit("校对完成")
             else:
                 self.signals.log.emit("取消校对")
@@ -1642,7 +2866,7 @@ class MainWindow(QMainWindow):
                 doc = Document()
                 doc.add_paragraph(self.result_text.toPlainText())
                 doc.save(file_path)
-                QMessageBox.information(self, "提示", f"Word文档已成功导出到：\n{file_path}")
+                self.statusBar().showMessage(f"Word文档已成功导出到：{file_path}", 5000)
         except ImportError:
             QMessageBox.warning(self, "警告", "请先安装python-docx库：\npip install python-docx")
     
@@ -1653,9 +2877,14 @@ class MainWindow(QMainWindow):
         dialog.oem_combo.setCurrentIndex(self.ocr_config.get('oem', 1))
         dialog.psm_combo.setCurrentIndex(self.ocr_config.get('psm', 3))
         dialog.dpi_spin.setValue(self.ocr_config.get('dpi', 300))
+        dialog.auto_dpi_check.setChecked(self.ocr_config.get('auto_dpi', False))
+        dialog.downsample_check.setChecked(self.ocr_config.get('downsample', False))
         dialog.contrast_slider.setValue(int(self.ocr_config.get('contrast', 1.0) * 100))
         dialog.brightness_slider.setValue(int(self.ocr_config.get('brightness', 1.0) * 100))
         dialog.sharpen_slider.setValue(int(self.ocr_config.get('sharpen', 1.0) * 100))
+        dialog.binarize_check.setChecked(self.ocr_config.get('binarize', False))
+        dialog.adaptive_contrast_check.setChecked(self.ocr_config.get('adaptive_contrast', False))
+        dialog.text_layer_check.setChecked(self.ocr_config.get('use_text_layer', True))
         # 设置识别来源
         source = self.ocr_config.get('source', '本地OCR (Tesseract)')
         dialog.source_combo.setCurrentText(source)
@@ -1664,15 +2893,13 @@ class MainWindow(QMainWindow):
             self.ocr_config = dialog.get_config()
             # 保存OCR配置
             self.settings.setValue("ocr_config", self.ocr_config)
-            self.log_text.append("OCR配置已更新并保存")
+            self._update_log("OCR配置已更新并保存")
     
     def update_stats(self, text):
         # 更新统计信息
-        lines = text.split('\n')
-        words = sum(len(line.split()) for line in lines)
-        chars = sum(len(line) for line in lines)
+        lines, words, chars = text_stats(text)
         self.stats_label.setText(
-            f"行数: {len(lines)} | 字数: {words} | 字符数: {chars}"
+            f"行数: {lines} | 字数: {words} | 字符数: {chars}"
         )
     
     def _update_log(self, message):
@@ -1695,19 +2922,65 @@ class MainWindow(QMainWindow):
         # 格式化消息
         formatted_message = f'<span style="color: #666666;">[{current_time}]</span> <span style="color: {color};">{message}</span>'
         
-        # 添加消息到日志
-        self.log_text.append(formatted_message)
+        # 先放入缓冲区，由定时器统一写入
+        self._log_buf.append(formatted_message)
+    
+    def _flush_log_buffer(self):
+        """把缓冲的日志一次性写入日志窗口"""
+        if not self._log_buf:
+            return
+        messages = list(self._log_buf)
+        self._log_buf.clear()
+        
+        # 在一个编辑块内插入所有行，只触发一次布局
+        document = self.log_text.document()
+        cursor = QTextCursor(document)
+        cursor.movePosition(QTextCursor.End)
+        cursor.beginEditBlock()
+        for message in messages:
+            if not document.isEmpty():
+                cursor.insertBlock()
+            cursor.insertHtml(message)
+        cursor.endEditBlock()
         
         # 自动滚动到底部
         self.log_text.verticalScrollBar().setValue(
             self.log_text.verticalScrollBar().maximum()
         )
     
+    def _clear_log(self):
+        self._log_buf.clear()
+        self.log_text.clear()
+    
+    def _update_log_batch(self, messages):
+        """显示OCR线程批量发送的日志"""
+        for message in messages:
+            self._update_log(message)
+    
     def _update_progress(self, value):
-        self.progress_bar.setValue(value)
+        # 值未变化时不触发重绘
+        if value != self.progress_bar.value():
+            self.progress_bar.setValue(value)
+    
+    def _append_page(self, worker, index, page_text):
+        """识别完一页立即追加显示"""
+        # 已取消的旧任务在断开连接前发出的信号
+        if worker is not self.current_worker:
+            return
+        cursor = QTextCursor(self.result_text.document())
+        cursor.movePosition(QTextCursor.End)
+        cursor.insertText(page_text)
+        self._streamed_pages.append(page_text)
     
-    def _ocr_finished(self, result):
-        self.result_text.setText(result)
+    def _ocr_finished(self, worker, pdf_path, result):
+        if worker is not self.current_worker:
+            return
+        # 各页已逐页追加时无需重建整个文档；长度不同时不必拼接比较
+        streamed_length = sum(map(len, self._streamed_pages))
+        if streamed_length != len(result) or "".join(self._streamed_pages) != result:
+            self.result_text.setPlainText(result)
+        self._streamed_pages = []
+        self._ocr_pages = worker.ocr_pages
         self.select_button.setEnabled(True)
         self.select_multiple_button.setEnabled(True)
         self.copy_button.setEnabled(True)
@@ -1720,40 +2993,13 @@ class MainWindow(QMainWindow):
         # 更新统计信息
         self.update_stats(result)
         
+        # 取消时的结果不完整，不覆盖历史记录和已保存的结果
+        if worker.is_stopped():
+            return
         # 添加到历史记录
-        if hasattr(self, 'current_pdf_path'):
-            self.add_to_history(self.current_pdf_path, result)
-            # 自动保存结果
-            self.auto_save_result(result, self.current_pdf_path)
-    
-    def change_theme(self, theme):
-        if theme == "深色" and self.current_theme == "浅色":
-            self.setStyleSheet("""
-                QMainWindow, QWidget {
-                    background-color: #2b2b2b;
-                    color: #ffffff;
-                }
-                QPushButton {
-                    background-color: #3c3f41;
-                    color: #ffffff;
-                    border: 1px solid #555555;
-                }
-                QPushButton:hover {
-                    background-color: #4c4f51;
-                }
-                QTextEdit {
-                    background-color: #323232;
-                    color: #ffffff;
-                }
-                QComboBox, QSpinBox {
-                    background-color: #3c3f41;
-                    color: #ffffff;
-                }
-            """)
-            self.current_theme = "深色"
-        elif theme == "浅色" and self.current_theme == "深色":
-            self.setStyleSheet("")
-            self.current_theme = "浅色"
+        self.add_to_history(pdf_path, result)
+        # 自动保存结果
+        self.auto_save_result(result, pdf_path)
     
     def select_multiple_pdf(self):
         file_paths, _ = QFileDialog.getOpenFileNames(
@@ -1767,18 +3013,75 @@ class MainWindow(QMainWindow):
             self.batch_process_pdfs(file_paths)
     
     def batch_process_pdfs(self, file_paths):
+        """并行处理多个PDF文件"""
+        # 去掉重复文件，保持选择顺序
+        file_paths = list(dict.fromkeys(file_paths))
         total_files = len(file_paths)
+        
+        self.select_button.setEnabled(False)
+        self.select_multiple_button.setEnabled(False)
+        self.copy_button.setEnabled(False)
+        self.export_button.setEnabled(False)
+        self.proofread_button.setEnabled(False)
+        self.config_button.setEnabled(False)
+        self.cancel_button.setEnabled(True)
         self.progress_bar.setMaximum(total_files)
         self.progress_bar.setValue(0)
         self.progress_bar.setVisible(True)
+        self.result_text.clear()
+        self._clear_log()
+        
+        self.batch_paths = file_paths
+        self.batch_results = {}
+        self.workers = {}
         
+        # 所有文件一次性提交到线程池
         for i, file_path in enumerate(file_paths):
-            self.log_text.append(f"正在处理文件 {i+1}/{total_files}: {os.path.basename(file_path)}")
-            self.start_ocr(file_path)
-            self.progress_bar.setValue(i + 1)
+            self._update_log(f"正在处理文件 {i+1}/{total_files}: {os.path.basename(file_path)}")
+            self.add_to_recent(file_path)
+            
+            worker = OCRWorker(file_path, self.ocr_config,
+                               verbose=self.verbose_log_check.isChecked())
+            worker.signals.log_batch.connect(self._update_log_batch)
+            worker.signals.finished.connect(partial(self._batch_file_finished, file_path))
+            self.workers[file_path] = worker
+        
+        for worker in self.workers.values():
+            self.thread_pool.start(worker)
+    
+    def _batch_file_finished(self, file_path, result):
+        """批量处理中单个文件完成"""
+        # 已取消的任务不再更新界面
+        if file_path not in self.workers:
+            return
+        del self.workers[file_path]
+        
+        self.batch_results[file_path] = result
+        self.progress_bar.setValue(len(self.batch_results))
+        self._update_log(f"完成 {len(self.batch_results)}/{len(self.batch_paths)}: {os.path.basename(file_path)}")
+        self.add_to_history(file_path, result)
+        self.auto_save_result(result, file_path)
         
+        if self.workers:
+            return
+        
+        # 全部完成后按选择顺序合并显示结果
+        combined = "".join(
+            f"########## {os.path.basename(path)} ##########\n{self.batch_results[path]}\n"
+            for path in self.batch_paths
+        )
+        self.result_text.setPlainText(combined)
+        self._ocr_pages = None
+        self.update_stats(combined)
+        self.select_button.setEnabled(True)
+        self.select_multiple_button.setEnabled(True)
+        self.copy_button.setEnabled(True)
+        self.export_button.setEnabled(True)
+        self.proofread_button.setEnabled(True)
+        self.config_button.setEnabled(True)
+        self.cancel_button.setEnabled(False)
         self.progress_bar.setVisible(False)
-        QMessageBox.information(self, "完成", f"已处理 {total_files} 个文件")
+        QMessageBox.information(self, "完成", f"已处理 {len(self.batch_paths)} 个文件")
     
     def select_pdf(self):
         file_path, _ = QFileDialog.getOpenFileName(
@@ -1794,7 +3097,8 @@ class MainWindow(QMainWindow):
     def copy_text(self):
         clipboard = QApplication.clipboard()
         clipboard.setText(self.result_text.toPlainText())
-        QMessageBox.information(self, "提示", "文本已复制到剪贴板")
+        # 在状态栏提示，不弹出模态对话框
+        self.statusBar().showMessage("文本已复制到剪贴板", 2000)
     
     def export_text(self):
         file_path, _ = QFileDialog.getSaveFileName(
@@ -1822,7 +3126,7 @@ class MainWindow(QMainWindow):
                 with open(file_path, 'w', encoding='utf-8') as f:
                     f.write(text_content)
                 
-                QMessageBox.information(self, "提示", f"文本已成功导出到：\n{file_path}")
+                self.statusBar().showMessage(f"文本已成功导出到：{file_path}", 5000)
             except Exception as e:
                 QMessageBox.critical(self, "错误", f"导出失败: {str(e)}\n请检查文件路径是否有写入权限。")
     
@@ -1834,33 +3138,49 @@ class MainWindow(QMainWindow):
         self.proofread_button.setEnabled(False)
         self.config_button.setEnabled(False)
         self.cancel_button.setEnabled(True)
-        self.progress_bar.setVisible(True)
+        # 单个文件按百分比显示进度，批量处理后需恢复最大值
+        self.progress_bar.setMaximum(100)
         self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
         self.result_text.clear()
-        self.log_text.clear()
+        self._streamed_pages = []
+        self._clear_log()
         
         self.current_pdf_path = pdf_path
         # 添加到最近文件列表
         self.add_to_recent(pdf_path)
         
-        self.current_worker = OCRWorker(
-            pdf_path,
-            self.ocr_config,
-            self.signals.progress.emit,
-            self.signals.log.emit,
-            self.signals.finished.emit
-        )
-        self.thread_pool.start(self.current_worker)
+        worker = self.current_worker = OCRWorker(pdf_path, self.ocr_config,
+                                                 verbose=self.verbose_log_check.isChecked())
+        worker.signals.log_batch.connect(self._update_log_batch)
+        worker.signals.progress.connect(self._update_progress)
+        # 绑定发出信号的任务，忽略已取消的旧任务
+        worker.signals.page_done.connect(partial(self._append_page, worker))
+        worker.signals.finished.connect(partial(self._ocr_finished, worker, pdf_path))
+        self.thread_pool.start(worker)
     
     def cancel_ocr(self):
-        if hasattr(self, 'current_worker'):
+        if getattr(self, 'workers', None):
+            # 取消批量处理中的所有文件
+            for worker in self.workers.values():
+                worker.stop()
+                worker.disconnect_signals()
+            self.workers = {}
+            self.cancel_button.setEnabled(False)
+            self.select_button.setEnabled(True)
+            self.select_multiple_button.setEnabled(True)
+            self.config_button.setEnabled(True)
+            self.progress_bar.setVisible(False)
+            self._update_log("处理已取消")
+        elif hasattr(self, 'current_worker'):
             self.current_worker.stop()
+            self.current_worker.disconnect_signals()
             self.cancel_button.setEnabled(False)
             self.select_button.setEnabled(True)
             self.select_multiple_button.setEnabled(True)
             self.config_button.setEnabled(True)
             self.progress_bar.setVisible(False)
-            self.log_text.append("处理已取消")
+            self._update_log("处理已取消")
     
     def show_history_context_menu(self, position):
         # 创建右键菜单
@@ -1869,8 +3189,8 @@ class MainWindow(QMainWindow):
         clear_all_action = menu.addAction("清空所有")
         
         # 获取右键点击的项目
-        item = self.history_list.itemAt(position)
-        if item:
+        item = self.history_list.indexAt(position)
+        if item.isValid():
             # 执行删除操作
             action = menu.exec_(self.history_list.mapToGlobal(position))
             if action == delete_action:
@@ -1885,20 +3205,20 @@ class MainWindow(QMainWindow):
     
     def delete_history_item(self, item):
         # 获取要删除的项目的索引
-        index = self.history_list.row(item)
+        index = item.row()
         # 从历史记录中删除
+        removed = self.history[-(index + 1)]
         del self.history[-(index + 1)]
-        # 保存更新后的历史记录
-        self.save_history()
-        # 更新历史记录列表显示
-        self.update_history_list()
+        self._history_db.execute("DELETE FROM history WHERE id = ?", (removed['id'],))
+        # 只移除对应的一行，不重建整个列表
+        self._history_model.removeRow(index)
     
     def clear_all_history(self):
         reply = QMessageBox.question(self, '确认', '确定要清空所有历史记录吗？',
                                    QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         if reply == QMessageBox.Yes:
-            self.history = []
-            self.save_history()
+            self.history = deque(maxlen=MAX_HISTORY)
+            self._history_db.execute("DELETE FROM history")
             self.update_history_list()
     
     def load_recent_files(self):
@@ -1910,36 +3230,43 @@ class MainWindow(QMainWindow):
             self.recent_files = []
     
     def save_recent_files(self):
-        with open('recent_files.json', 'w', encoding='utf-8') as f:
-            json.dump(self.recent_files, f, ensure_ascii=False, indent=2)
+        self._recent_save_task.schedule(QThreadPool.globalInstance(), list(self.recent_files))
     
     def update_recent_list(self):
-        self.recent_list.clear()
+        # 文件大小缓存在内存中，只批量读取尚未缓存的文件，文件不存在时为-1
+        missing = [path for path in self.recent_files if path not in self._recent_sizes]
+        if missing:
+            self._recent_sizes.update(file_sizes(missing))
+        display_texts = []
         for file_path in reversed(self.recent_files):
-            if os.path.exists(file_path):
+            file_size = self._recent_sizes[file_path]
+            if file_size >= 0:
                 file_name = os.path.basename(file_path)
-                file_size = os.path.getsize(file_path)
                 file_size_str = f"{file_size/1024:.1f}KB" if file_size < 1024*1024 else f"{file_size/1024/1024:.1f}MB"
-                self.recent_list.addItem(f"📄 {file_name}\n📊 {file_size_str}")
+                display_texts.append(f"📄 {file_name}\n📊 {file_size_str}")
+        self._recent_model.setStringList(display_texts)
     
     def add_to_recent(self, file_path):
         if file_path in self.recent_files:
             self.recent_files.remove(file_path)
         self.recent_files.insert(0, file_path)
+        # 重新打开的文件可能已变化，重新读取大小
+        self._recent_sizes.pop(file_path, None)
         # 限制最近文件数量
         if len(self.recent_files) > 10:
             self.recent_files = self.recent_files[:10]
         self.save_recent_files()
         self.update_recent_list()
     
-    def load_recent_file(self, item):
-        index = self.recent_list.row(item)
+    def load_recent_file(self, model_index):
+        index = model_index.row()
         file_path = self.recent_files[-(index + 1)]
         if os.path.exists(file_path):
             self.start_ocr(file_path)
         else:
             QMessageBox.warning(self, "警告", "文件不存在")
             self.recent_files.remove(file_path)
+            self._recent_sizes.pop(file_path, None)
             self.save_recent_files()
             self.update_recent_list()
     
@@ -1948,8 +3275,8 @@ class MainWindow(QMainWindow):
         delete_action = menu.addAction("删除")
         clear_all_action = menu.addAction("清空所有")
         
-        item = self.recent_list.itemAt(position)
-        if item:
+        item = self.recent_list.indexAt(position)
+        if item.isValid():
             action = menu.exec_(self.recent_list.mapToGlobal(position))
             if action == delete_action:
                 self.delete_recent_item(item)
@@ -1961,7 +3288,7 @@ class MainWindow(QMainWindow):
                 self.clear_all_recent()
     
     def delete_recent_item(self, item):
-        index = self.recent_list.row(item)
+        index = item.row()
         del self.recent_files[-(index + 1)]
         self.save_recent_files()
         self.update_recent_list()
@@ -1971,6 +3298,7 @@ class MainWindow(QMainWindow):
                                    QMessageBox.Yes | QMessageBox.No, QMessageBox.No)
         if reply == QMessageBox.Yes:
             self.recent_files = []
+            self._recent_sizes.clear()
             self.save_recent_files()
             self.update_recent_list()
     
@@ -1987,7 +3315,7 @@ class MainWindow(QMainWindow):
         """更新字体大小"""
         # 更新日志窗口字体
         self.log_text.setStyleSheet(f"""
-            QTextEdit {{
+            QPlainTextEdit {{
                 background-color: #f0f0f0;
                 font-family: 'Consolas', 'Courier New', monospace;
                 font-size: {size}px;
@@ -1997,7 +3325,7 @@ class MainWindow(QMainWindow):
         
         # 更新结果窗口字体
         self.result_text.setStyleSheet(f"""
-            QTextEdit {{
+            QPlainTextEdit {{
                 font-family: 'Consolas', 'Courier New', monospace;
                 font-size: {size}px;
                 line-height: 1.5;
@@ -2108,7 +3436,7 @@ class MainWindow(QMainWindow):
                 QApplication.processEvents()
                 
             except Exception as e:
-                self.log_text.append(f"处理文件 {file} 时出错: {str(e)}")
+                self._update_log(f"处理文件 {file} 时出错: {str(e)}")
                 
         self.batch_progress.setVisible(False)
         QMessageBox.information(self, "完成", "批量导出完成")
@@ -2146,7 +3474,7 @@ class MainWindow(QMainWindow):
         if dialog.exec_() == QDialog.Accepted:
             self.auto_save_config = dialog.get_config()
             self.settings.setValue("auto_save_config", self.auto_save_config)
-            self.log_text.append("自动保存设置已更新并保存")
+            self._update_log("自动保存设置已更新并保存")
 
     def auto_save_result(self, result, pdf_path):
         """自动保存OCR结果"""
@@ -2186,10 +3514,10 @@ class MainWindow(QMainWindow):
                 c.drawText(textobject)
                 c.save()
                 
-            self.log_text.append(f"结果已自动保存到: {output_path}")
+            self._update_log(f"结果已自动保存到: {output_path}")
             
         except Exception as e:
-            self.log_text.append(f"自动保存失败: {str(e)}")
+            self._update_log(f"自动保存失败: {str(e)}")
 
     def show_export_dialog(self):
         """显示导出对话框"""
@@ -2241,7 +3569,7 @@ class MainWindow(QMainWindow):
                 c.drawText(textobject)
                 c.save()
             
-            QMessageBox.information(self, "成功", f"文件已导出到：\n{output_path}")
+            self.statusBar().showMessage(f"文件已导出到：{output_path}", 5000)
             
         except Exception as e:
             QMessageBox.critical(self, "错误", f"导出失败: {str(e)}")
@@ -2315,7 +3643,7 @@ class MainWindow(QMainWindow):
                 QApplication.processEvents()
                 
             except Exception as e:
-                self.log_text.append(f"处理文件 {file} 时出错: {str(e)}")
+                self._update_log(f"处理文件 {file} 时出错: {str(e)}")
                 
         self.batch_progress.setVisible(False)
         QMessageBox.information(self, "完成", "批量导出完成")
@@ -2334,11 +3662,7 @@ class MainWindow(QMainWindow):
         """显示主题设置对话框"""
         dialog = ThemeDialog(self)
         if dialog.exec_() == QDialog.Accepted:
-            new_theme = dialog.get_selected_theme()
-            if new_theme != self.current_theme:
-                self.current_theme = new_theme
-                self.apply_theme()
-                self.save_settings()
+            self.set_theme(dialog.get_selected_theme())
 
 class ProofreadDialog(QDialog):
     def __init__(self, parent=None):
@@ -2453,8 +3777,8 @@ class ProofreadDialog(QDialog):
     
     def set_text(self, text):
         """设置校对文本"""
-        self.text_edit.setText(text)
-        self.update_word_count()
+        # 按纯文本设置，避免按HTML解析；字数统计由textChanged信号更新，不再重复计算
+        self.text_edit.setPlainText(text)
     
     def get_text(self):
         """获取校对后的文本"""
@@ -2474,16 +3798,10 @@ class ProofreadDialog(QDialog):
             img = self.images[self.current_page]
             
             # 将PIL图像转换为QImage
+            from PIL import Image
             if isinstance(img, Image.Image):
-                # 确保图像是RGB模式
-                if img.mode != 'RGB':
-                    img = img.convert('RGB')
-                # 转换为字节数据
-                data = img.tobytes('raw', 'RGB')
-                # 创建QImage
-                qimage = QImage(data, img.size[0], img.size[1], QImage.Format_RGB888)
                 # 转换为QPixmap并显示
-                pixmap = QPixmap.fromImage(qimage)
+                pixmap = QPixmap.fromImage(pil_to_qimage(img))
                 # 缩放图像以适应标签大小
                 scaled_pixmap = pixmap.scaled(
                     self.image_label.size(),
@@ -2498,6 +3816,11 @@ class ProofreadDialog(QDialog):
             # 更新按钮状态
             self.prev_button.setEnabled(self.current_page > 0)
             self.next_button.setEnabled(self.current_page < self.total_pages - 1)
+        else:
+            self.image_label.setText("没有页面图像")
+            self.page_label.setText("仅校对文本")
+            self.prev_button.setEnabled(False)
+            self.next_button.setEnabled(False)
     
     def prev_page(self):
         """显示上一页"""
@@ -2735,7 +4058,7 @@ class PreviewWidget(QWidget):
             
         # 显示文本
         if text:
-            self.text_edit.setText(text)
+            self.text_edit.setPlainText(text)
         else:
             self.text_edit.clear()
             
@@ -2794,7 +4117,9 @@ class AutoSaveSettingsDialog(QDialog):
     
     def load_settings(self):
         """加载当前设置"""
-        settings = QSettings("PDF_OCR", "Settings")
+        # 主窗口的设置可能尚未写入，优先从主窗口的缓存读取
+        parent = self.parent()
+        settings = parent.settings if parent is not None else QSettings("PDF_OCR", "Settings")
         auto_save_config = settings.value("auto_save_config", {
             'enabled': False,
             'format': 'txt',
@@ -2988,6 +4313,8 @@ class ThemeManager:
                 "highlight": "#9370db"
             }
         }
+        # 已生成的样式表，避免重复格式化
+        self._stylesheets = {}
     
     def get_theme(self, name):
         """获取指定主题的样式表"""
@@ -3001,7 +4328,12 @@ class ThemeManager:
     
     def get_theme_stylesheet(self, theme_name):
         """获取主题的样式表字符串"""
-        theme = self.get_theme(theme_name)
+        stylesheet = self._stylesheets.get(theme_name)
+        if stylesheet is None:
+            stylesheet = self._stylesheets[theme_name] = self._build_stylesheet(self.get_theme(theme_name))
+        return stylesheet
+    
+    def _build_stylesheet(self, theme):
         return f"""
             QMainWindow, QWidget {{
                 background-color: {theme['background']};
@@ -3021,14 +4353,14 @@ class ThemeManager:
                 background-color: {theme['button_hover']};
                 border: 2px solid {theme['highlight']};
             }}
-            QTextEdit, QLineEdit, QComboBox, QSpinBox {{
+            QTextEdit, QPlainTextEdit, QLineEdit, QComboBox, QSpinBox {{
                 background-color: {theme['input_bg']};
                 color: {theme['input_text']};
                 border: 1px solid {theme['border']};
                 border-radius: 3px;
                 padding: 3px;
             }}
-            QListWidget {{
+            QListView {{
                 background-color: {theme['input_bg']};
                 color: {theme['input_text']};
                 border: 1px solid {theme['border']};
@@ -3134,6 +4466,8 @@ class ThemeDialog(QDialog):
         return self.theme_combo.currentText()
 
 if __name__ == '__main__':
+    # 打包后的程序启动页面识别子进程时需要
+    multiprocessing.freeze_support()
     app = QApplication(sys.argv)
     window = MainWindow()
     window.show()